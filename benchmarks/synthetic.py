@@ -0,0 +1,128 @@
+"""
+Synthetic Review Corpus for Benchmarks
+Generates seeded, realistic-looking bank app reviews at any scale
+Vocabulary comes from THEME_KEYWORDS plus positive/negative/filler words,
+and each bank gets its own rating mix around a J-shaped app store distribution
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'scripts'))
+
+from thematic_analysis import THEME_KEYWORDS
+
+BANK_NAMES = ['CBE', 'BOA', 'Dashen']
+
+# Share of 1..5 star ratings; app store ratings pile up at both ends
+RATING_MIX = [0.22, 0.05, 0.07, 0.10, 0.56]
+
+# Chance that a review with rating 1..5 carries positive / negative wording
+POSITIVE_RATE = [0.05, 0.15, 0.40, 0.80, 0.90]
+NEGATIVE_RATE = [0.90, 0.75, 0.40, 0.10, 0.05]
+
+# Number of theme phrases per review; a third of reviews match no theme
+THEME_PHRASES = [0, 1, 2, 3]
+THEME_PHRASES_MIX = [0.30, 0.45, 0.20, 0.05]
+
+POSITIVE_WORDS = [
+    'good', 'great', 'excellent', 'nice', 'love', 'best', 'amazing',
+    'helpful', 'perfect', 'wonderful', 'thank you', 'well done'
+]
+NEGATIVE_WORDS = [
+    'bad', 'worst', 'terrible', 'poor', 'hate', 'useless', 'annoying',
+    'horrible', 'disappointed', 'awful', 'waste of time'
+]
+FILLER_WORDS = [
+    'app', 'bank', 'mobile', 'banking', 'the', 'is', 'it', 'this', 'very',
+    'my', 'to', 'and', 'always', 'now', 'after', 'when', 'i', 'please',
+    'money', 'today', 'again', 'every', 'time', 'version', 'phone'
+]
+
+def bank_names(n_banks):
+    """Real bank names first, then numbered placeholders"""
+    return [BANK_NAMES[i] if i < len(BANK_NAMES) else f'Bank {i + 1}' for i in range(n_banks)]
+
+def _make_review(rng, rating, theme_phrases):
+    words = list(rng.choice(FILLER_WORDS, size=rng.integers(3, 12)))
+
+    n_themes = rng.choice(THEME_PHRASES, p=THEME_PHRASES_MIX)
+    for theme in rng.choice(len(theme_phrases), size=n_themes, replace=False):
+        words.append(rng.choice(theme_phrases[theme]))
+
+    if rng.random() < POSITIVE_RATE[rating - 1]:
+        words.append(rng.choice(POSITIVE_WORDS))
+    if rng.random() < NEGATIVE_RATE[rating - 1]:
+        words.append(rng.choice(NEGATIVE_WORDS))
+
+    rng.shuffle(words)
+    return ' '.join(words).capitalize()
+
+def _review_pools(rng, pool_size):
+    """Build `pool_size` distinct review texts for each star rating"""
+    theme_phrases = list(THEME_KEYWORDS.values())
+    return {
+        rating: np.array([_make_review(rng, rating, theme_phrases) for _ in range(pool_size)], dtype=object)
+        for rating in range(1, 6)
+    }
+
+def generate_reviews(n_reviews, n_banks=3, seed=0, pool_size=20000):
+    """
+    Generate a synthetic corpus with the columns of data/reviews_cleaned.csv
+    Review texts are drawn from per-rating pools of `pool_size` texts, so text
+    generation cost stays flat while the corpus scales to millions of rows
+    """
+    rng = np.random.default_rng(seed)
+    pools = _review_pools(rng, min(pool_size, max(n_reviews, 1)))
+    banks = bank_names(n_banks)
+
+    # Each bank gets its own rating mix scattered around RATING_MIX
+    bank_idx = rng.integers(0, n_banks, size=n_reviews)
+    bank_mix = rng.dirichlet(np.array(RATING_MIX) * 50, size=n_banks)
+    ratings = np.empty(n_reviews, dtype=np.int64)
+    for idx in range(n_banks):
+        mask = bank_idx == idx
+        ratings[mask] = rng.choice(np.arange(1, 6), size=mask.sum(), p=bank_mix[idx])
+
+    reviews = np.empty(n_reviews, dtype=object)
+    for rating, pool in pools.items():
+        mask = ratings == rating
+        reviews[mask] = pool[rng.integers(0, len(pool), size=mask.sum())]
+
+    dates = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 730, size=n_reviews), unit='D')
+
+    return pd.DataFrame({
+        'review': reviews,
+        'rating': ratings,
+        'date': dates.strftime('%Y-%m-%d'),
+        'bank': np.array(banks, dtype=object)[bank_idx],
+        'source': 'Google Play'
+    })
+
+def to_raw(df):
+    """Rename columns back to the google-play-scraper names preprocess() expects"""
+    return df.rename(columns={'review': 'content', 'rating': 'score', 'date': 'at'})
+
+def enrich(df):
+    """
+    Add the sentiment and theme columns of data/reviews_with_themes.csv
+    Scores are computed once per distinct text with the real pipeline
+    functions and mapped back onto the rows
+    """
+    from sentiment_analysis import analyze_sentiment, classify_sentiment
+    from thematic_analysis import assign_themes
+
+    texts = pd.Series(df['review'].unique())
+    compound = texts.apply(lambda t: analyze_sentiment(t)['compound'])
+    labels = compound.apply(classify_sentiment)
+    theme_names = texts.apply(assign_themes).apply(lambda x: ', '.join(x) if x else 'No Theme')
+
+    enriched = df.copy()
+    enriched['sentiment_score'] = df['review'].map(dict(zip(texts, compound)))
+    enriched['sentiment_label'] = df['review'].map(dict(zip(texts, labels)))
+    enriched['identified_themes'] = df['review'].map(dict(zip(texts, theme_names)))
+    return enriched
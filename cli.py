@@ -0,0 +1,131 @@
+"""
+Command-line entry point for the Bank App Review pipeline
+Runs one pipeline stage per subcommand:
+
+    python cli.py scrape
+    python cli.py preprocess
+    python cli.py sentiment [--no-plots] [--no-report] [--preview]
+    python cli.py themes [--no-plots] [--no-report] [--preview]
+    python cli.py load
+    python cli.py insights [--no-plots] [--no-report] [--preview] [--approximate [--sample-size N]]
+    python cli.py index build | search QUERY [--bank BANK] [--theme THEME] ...
+    python cli.py discover update [--input CSV] | report
+    python cli.py serve [--spool DIR] [--port PORT] ...
+
+Each stage module is imported only when its subcommand runs, and the stage
+modules import plotting and ML libraries only in the code paths that use
+them, so `--no-plots --no-report` runs never load matplotlib, seaborn,
+wordcloud or scikit-learn. Pass `--timings` to print measured startup
+(import) and run times, and `--metrics FILE` / `--prometheus FILE` /
+`--profile` to emit per-stage metrics (see scripts/instrumentation.py).
+"""
+
+import os
+import sys
+import time
+import argparse
+import importlib
+
+_CLI_START = time.perf_counter()
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.join(ROOT_DIR, 'scripts')
+
+# subcommand -> (module, entry function, kind, help)
+# kind: 'analysis' takes --no-plots/--no-report/--preview, 'passthrough' forwards
+# its remaining arguments to the entry function, 'plain' takes none
+STAGES = {
+    'scrape': ('scrape_reviews', 'main', 'plain', 'Scrape Google Play reviews into data/reviews_raw.csv'),
+    'preprocess': ('preprocess_reviews', 'preprocess', 'plain', 'Clean raw reviews into data/reviews_cleaned.csv'),
+    'sentiment': ('sentiment_analysis', 'main', 'analysis', 'Score review sentiment with VADER'),
+    'themes': ('thematic_analysis', 'main', 'analysis', 'Extract keywords and assign themes'),
+    'load': ('load_data', 'main', 'plain', 'Load reviews with themes into PostgreSQL'),
+    'insights': ('insights_analysis', 'main', 'analysis', 'Compare banks and plot drivers and pain points'),
+    'index': ('review_index', 'main', 'passthrough',
+              'Build or search the review full-text index (see scripts/review_index.py --help)'),
+    'discover': ('theme_discovery', 'main', 'passthrough',
+                 'Cluster new reviews and suggest THEME_KEYWORDS additions (see scripts/theme_discovery.py --help)'),
+    'serve': ('streaming_service', 'main', 'passthrough',
+              'Run the streaming scoring service (options: see scripts/streaming_service.py --help)')
+}
+
+# Analysis stages whose summaries can be estimated from samples and sketches
+APPROXIMATE_STAGES = {'insights'}
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Bank app review analysis pipeline")
+    parser.add_argument('--timings', action='store_true',
+                        help="Print measured startup (import) and run times")
+    parser.add_argument('--metrics', metavar='FILE',
+                        help="Append per-stage metrics as JSON lines to FILE ('-' for stderr)")
+    parser.add_argument('--prometheus', metavar='FILE',
+                        help="Write per-stage metrics to FILE in Prometheus text format")
+    parser.add_argument('--profile', action='store_true',
+                        help="Run the sampling profiler during the stage (reported in --metrics)")
+    parser.add_argument('--profile-dir', metavar='DIR',
+                        help="Also write collapsed-stack profiles to DIR")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    for command, (_, _, kind, help_text) in STAGES.items():
+        sub = subparsers.add_parser(command, help=help_text)
+        if kind == 'analysis':
+            sub.add_argument('--no-plots', action='store_true',
+                             help="Skip figure rendering (plotting libraries are never imported)")
+            sub.add_argument('--no-report', action='store_true',
+                             help="Skip printed summaries and written reports")
+            sub.add_argument('--preview', action='store_true',
+                             help="Render low-DPI preview figures into visualizations/preview/")
+        if command in APPROXIMATE_STAGES:
+            sub.add_argument('--approximate', action='store_true',
+                             help="Estimate summaries from per-bank samples and sketches, with error bounds")
+            sub.add_argument('--sample-size', type=int, default=2000,
+                             help="Reviews sampled per bank in approximate mode (default: 2000)")
+    return parser
+
+def run_stage(args):
+    """Import the stage module for `args.command` and run its main()"""
+    module_name, entry, kind, _ = STAGES[args.command]
+
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    import_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if kind == 'analysis':
+        options = {'plots': not args.no_plots, 'report': not args.no_report, 'preview': args.preview}
+        if args.command in APPROXIMATE_STAGES:
+            options.update(approximate=args.approximate, sample_size=args.sample_size)
+        getattr(module, entry)(**options)
+    elif kind == 'passthrough':
+        getattr(module, entry)(args.stage_args)
+    else:
+        getattr(module, entry)()
+    run_time = time.perf_counter() - start
+
+    return import_time, run_time
+
+def main(argv=None):
+    parser = build_parser()
+    args, stage_args = parser.parse_known_args(argv)
+    if stage_args and STAGES[args.command][2] != 'passthrough':
+        parser.error(f"unrecognized arguments: {' '.join(stage_args)}")
+    args.stage_args = stage_args
+
+    for path in (ROOT_DIR, SCRIPTS_DIR):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    import instrumentation
+    instrumentation.configure(metrics_path=args.metrics, prometheus_path=args.prometheus,
+                              profile=args.profile or None, profile_dir=args.profile_dir)
+
+    import_time, run_time = run_stage(args)
+
+    if args.timings:
+        print("\n=== Timings ===")
+        print(f"Startup (import {STAGES[args.command][0]}): {import_time:.3f}s")
+        print(f"Run: {run_time:.3f}s")
+        print(f"Total: {time.perf_counter() - _CLI_START:.3f}s")
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,23 @@
 import pandas as pd
 import os
+import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from instrumentation import instrument, record_rows, record_failure
+
+@instrument('preprocess')
 def preprocess():
     input_file = 'data/reviews_raw.csv'
     output_file = 'data/reviews_cleaned.csv'
     
     if not os.path.exists(input_file):
         print(f"Error: {input_file} not found. Run scrape_reviews.py first.")
+        record_failure()
         return
 
     try:
         df = pd.read_csv(input_file)
+        record_rows(rows_in=len(df))
         
         print(f"Initial shape: {df.shape}")
         
@@ -49,10 +56,12 @@ def preprocess():
         print(f"Final shape: {df.shape}")
         
         df.to_csv(output_file, index=False)
+        record_rows(rows_out=len(df))
         print(f"Saved cleaned data to {output_file}")
         
     except Exception as e:
         print(f"Error during preprocessing: {e}")
+        record_failure()
 
 if __name__ == "__main__":
     preprocess()
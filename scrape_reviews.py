@@ -1,6 +1,10 @@
 from google_play_scraper import reviews, Sort
 import pandas as pd
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from instrumentation import instrument, record_failure
 
 APP_IDS = {
     "CBE": "com.combanketh.mobilebanking",
@@ -8,6 +12,7 @@ APP_IDS = {
     "Dashen": "com.dashen.dashensuperapp"
 }
 
+@instrument('scrape')
 def scrape_reviews():
     all_reviews = []
     
@@ -35,10 +40,11 @@ def scrape_reviews():
                 all_reviews.append(r)
         except Exception as e:
             print(f"Error scraping {bank_name}: {e}")
+            record_failure()
             
     return all_reviews
 
-if __name__ == "__main__":
+def main():
     data = scrape_reviews()
     if data:
         df = pd.DataFrame(data)
@@ -50,3 +56,6 @@ if __name__ == "__main__":
         print(f"Saved {len(df)} raw reviews to {output_path}")
     else:
         print("No data scraped.")
+
+if __name__ == "__main__":
+    main()
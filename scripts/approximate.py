@@ -0,0 +1,287 @@
+"""
+Approximate Analytics for Bank App Reviews
+Answers per-bank means, sentiment distributions and top-k theme questions
+from stratified samples (with confidence intervals) and mergeable sketches,
+in one bounded-memory pass over the data
+
+Every structure here can be updated chunk by chunk and merged across shards:
+    StratifiedSample  bottom-k uniform sample per stratum (e.g. per bank)
+    CountMinSketch    frequency estimates, never under-counting
+    SpaceSaving       top-k heavy hitters with per-item error bounds
+"""
+
+import math
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+Z_95 = 1.96
+
+def _stable_hash(item, seed):
+    """Process-independent 64-bit hash, so sketches built on different machines merge"""
+    digest = hashlib.blake2b(str(item).encode('utf-8'), digest_size=8,
+                             salt=seed.to_bytes(8, 'little')).digest()
+    return int.from_bytes(digest, 'little')
+
+class CountMinSketch:
+    """
+    Count-Min sketch: estimate(x) >= true count, and
+    estimate(x) - true count <= epsilon * total with probability >= 1 - delta
+    """
+
+    def __init__(self, width=2048, depth=5):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+
+    @property
+    def epsilon(self):
+        return math.e / self.width
+
+    @property
+    def delta(self):
+        return math.exp(-self.depth)
+
+    def _columns(self, item):
+        return [_stable_hash(item, row) % self.width for row in range(self.depth)]
+
+    def add(self, item, count=1):
+        for row, col in enumerate(self._columns(item)):
+            self.table[row, col] += count
+        self.total += count
+
+    def update(self, counts):
+        """Add a mapping or Series of item -> count"""
+        for item, count in counts.items():
+            self.add(item, int(count))
+
+    def estimate(self, item):
+        return int(min(self.table[row, col] for row, col in enumerate(self._columns(item))))
+
+    def error_bound(self):
+        """Additive over-count bound holding with probability 1 - delta"""
+        return self.epsilon * self.total
+
+    def merge(self, other):
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("Can only merge Count-Min sketches with the same width and depth")
+        self.table += other.table
+        self.total += other.total
+        return self
+
+class SpaceSaving:
+    """
+    Space-Saving top-k summary with k counters: each reported count c with
+    error e satisfies c - e <= true count <= c, and e <= total / k
+    """
+
+    def __init__(self, k=50):
+        self.k = k
+        self.counts = {}
+        self.errors = {}
+        self.total = 0
+
+    def _min_count(self):
+        return min(self.counts.values()) if len(self.counts) >= self.k else 0
+
+    def add(self, item, count=1):
+        self.total += count
+        if item in self.counts:
+            self.counts[item] += count
+        elif len(self.counts) < self.k:
+            self.counts[item] = count
+            self.errors[item] = 0
+        else:
+            # Replace the smallest counter; its count becomes the new item's error
+            victim = min(self.counts, key=self.counts.get)
+            floor = self.counts.pop(victim)
+            self.errors.pop(victim)
+            self.counts[item] = floor + count
+            self.errors[item] = floor
+
+    def update(self, counts):
+        """Add a mapping or Series of item -> count"""
+        for item, count in counts.items():
+            self.add(item, int(count))
+
+    def merge(self, other):
+        """Merge another summary (Agarwal et al., 'Mergeable Summaries')"""
+        floor_self, floor_other = self._min_count(), other._min_count()
+        counts, errors = {}, {}
+        for item in set(self.counts) | set(other.counts):
+            counts[item] = self.counts.get(item, floor_self) + other.counts.get(item, floor_other)
+            errors[item] = (self.errors.get(item, floor_self) + other.errors.get(item, floor_other))
+        keep = sorted(counts, key=counts.get, reverse=True)[:self.k]
+        self.counts = {item: counts[item] for item in keep}
+        self.errors = {item: errors[item] for item in keep}
+        self.total += other.total
+        return self
+
+    def top(self, n=10):
+        """[(item, estimated count, max over-count)] for the n heaviest items"""
+        items = sorted(self.counts, key=self.counts.get, reverse=True)[:n]
+        return [(item, self.counts[item], self.errors[item]) for item in items]
+
+    def error_bound(self):
+        return self.total / self.k
+
+class StratifiedSample:
+    """
+    Uniform sample of up to `size` rows per stratum, kept as the rows with the
+    smallest random keys (bottom-k), so chunks and shards can be merged
+    Shards sampled separately must use different seeds
+    """
+
+    def __init__(self, size=2000, strata='bank', seed=0):
+        self.size = size
+        self.strata = strata
+        self.rng = np.random.default_rng(seed)
+        self.population = {}
+        self.samples = {}
+
+    def add(self, chunk):
+        keyed = chunk.assign(_key=self.rng.random(len(chunk)))
+        for stratum, group in keyed.groupby(self.strata, sort=False):
+            self.population[stratum] = self.population.get(stratum, 0) + len(group)
+            self._keep(stratum, group)
+
+    def _keep(self, stratum, rows):
+        if stratum in self.samples:
+            rows = pd.concat([self.samples[stratum], rows])
+        self.samples[stratum] = rows.nsmallest(self.size, '_key')
+
+    def merge(self, other):
+        for stratum, rows in other.samples.items():
+            self.population[stratum] = self.population.get(stratum, 0) + other.population[stratum]
+            self._keep(stratum, rows)
+        return self
+
+    def sample(self):
+        return pd.concat(self.samples.values()).drop(columns='_key') if self.samples else pd.DataFrame()
+
+    def _fpc(self, n, N):
+        """Finite population correction"""
+        return (N - n) / (N - 1) if N > 1 else 0.0
+
+    def estimate_means(self, column):
+        """
+        Per-stratum mean of `column` with 95% CI half-widths, plus the
+        population-weighted overall mean
+        Returns: DataFrame indexed by stratum (and 'Overall') with mean, ci, n, N
+        """
+        rows = {}
+        total = sum(self.population.values())
+        overall_mean, overall_var = 0.0, 0.0
+        for stratum, sample in self.samples.items():
+            values = sample[column].dropna()
+            n, N = len(values), self.population[stratum]
+            if n == 0:
+                continue
+            mean = values.mean()
+            var = values.var(ddof=1) / n * self._fpc(n, N) if n > 1 else 0.0
+            rows[stratum] = {'mean': mean, 'ci': Z_95 * math.sqrt(var), 'n': n, 'N': N}
+
+            weight = N / total
+            overall_mean += weight * mean
+            overall_var += weight ** 2 * var
+
+        rows['Overall'] = {'mean': overall_mean, 'ci': Z_95 * math.sqrt(overall_var),
+                           'n': sum(r['n'] for r in rows.values()), 'N': total}
+        return pd.DataFrame.from_dict(rows, orient='index')
+
+    def estimate_proportions(self, column):
+        """
+        Share of each value of `column` per stratum with 95% CI half-widths,
+        plus population-weighted 'Overall' shares
+        Returns: DataFrame with columns stratum, value, proportion, ci
+        """
+        rows = []
+        total = sum(self.population.values())
+        overall = {}
+        for stratum, sample in self.samples.items():
+            n, N = len(sample), self.population[stratum]
+            if n == 0:
+                continue
+            fpc = self._fpc(n, N)
+            weight = N / total
+            # Values absent from this stratum's sample add nothing to the overall share
+            for value, p in sample[column].value_counts(normalize=True).items():
+                var = p * (1 - p) / n * fpc
+                rows.append({'stratum': stratum, 'value': value, 'proportion': p,
+                             'ci': Z_95 * math.sqrt(var)})
+                mean, overall_var = overall.get(value, (0.0, 0.0))
+                overall[value] = (mean + weight * p, overall_var + weight ** 2 * var)
+
+        for value, (p, var) in sorted(overall.items(), key=lambda item: -item[1][0]):
+            rows.append({'stratum': 'Overall', 'value': value, 'proportion': p,
+                         'ci': Z_95 * math.sqrt(var)})
+        return pd.DataFrame(rows, columns=['stratum', 'value', 'proportion', 'ci'])
+
+def theme_list(identified_themes):
+    """Split an identified_themes string into individual themes"""
+    if pd.isna(identified_themes) or identified_themes == 'No Theme':
+        return []
+    return [theme.strip() for theme in str(identified_themes).split(',')]
+
+class ReviewSketches:
+    """
+    Everything the approximate insights need, built in one pass over review chunks:
+    a per-bank stratified sample and, per bank, top-k summaries of themes
+    overall, in positive reviews (drivers) and in negative reviews (pain points)
+    """
+
+    def __init__(self, sample_size=2000, k=50, seed=0):
+        self.sample = StratifiedSample(size=sample_size, strata='bank', seed=seed)
+        self.k = k
+        self.themes = {}
+        self.drivers = {}
+        self.pain_points = {}
+        self.theme_counts = CountMinSketch()
+
+    def _summary(self, table, bank):
+        if bank not in table:
+            table[bank] = SpaceSaving(self.k)
+        return table[bank]
+
+    def add(self, chunk):
+        columns = [c for c in ('bank', 'rating', 'sentiment_score', 'sentiment_label') if c in chunk.columns]
+        self.sample.add(chunk[columns])
+
+        if 'identified_themes' not in chunk.columns:
+            return
+        for bank, group in chunk.groupby('bank', sort=False):
+            themes = group['identified_themes'].map(theme_list).explode().dropna()
+            counts = themes.value_counts()
+            self._summary(self.themes, bank).update(counts)
+            self.theme_counts.update(counts)
+
+            # Combined theme strings, matching analyze_bank's value_counts
+            positive = group.loc[group['rating'] >= 4, 'identified_themes'].value_counts()
+            negative = group.loc[group['rating'] <= 2, 'identified_themes'].value_counts()
+            self._summary(self.drivers, bank).update(positive)
+            self._summary(self.pain_points, bank).update(negative)
+
+    def merge(self, other):
+        self.sample.merge(other.sample)
+        for mine, theirs in ((self.themes, other.themes), (self.drivers, other.drivers),
+                             (self.pain_points, other.pain_points)):
+            for bank, summary in theirs.items():
+                if bank in mine:
+                    mine[bank].merge(summary)
+                else:
+                    mine[bank] = summary
+        self.theme_counts.merge(other.theme_counts)
+        return self
+
+def sketch_csv(path, chunksize=100000, sample_size=2000, k=50, seed=0):
+    """Build ReviewSketches from a reviews CSV without loading it whole"""
+    sketches = ReviewSketches(sample_size=sample_size, k=k, seed=seed)
+    usecols = lambda c: c in ('bank', 'rating', 'sentiment_score', 'sentiment_label', 'identified_themes')
+    for chunk in pd.read_csv(path, chunksize=chunksize, usecols=usecols):
+        sketches.add(chunk)
+    return sketches
+
+def format_estimate(mean, ci, digits=2):
+    return f"{mean:.{digits}f} ± {ci:.{digits}f}"
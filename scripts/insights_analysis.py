@@ -1,6 +1,8 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+from rendering import figure_spec, render_figures
+from instrumentation import instrument, record_rows, record_failure
+from approximate import sketch_csv, format_estimate
+from thematic_analysis import THEME_KEYWORDS
 import os
 import ast
 
@@ -39,53 +41,167 @@ def analyze_bank(df, bank_name):
         
     return avg_rating, avg_sentiment
 
-def generate_comparison_plots(df, output_dir):
-    # 1. Average Sentiment by Bank
-    plt.figure(figsize=(10, 6))
-    sns.barplot(x='bank', y='sentiment_score', data=df, estimator='mean', errorbar=None)
+def analyze_bank_approximate(sketches, bank_name, rating_means, sentiment_means, sentiment_shares, top_n=3):
+    """
+    analyze_bank from a ReviewSketches pass: means and shares come from the
+    bank's sample with 95% CIs, theme counts from Space-Saving summaries with
+    their maximum over-count
+    """
+    rating, sentiment = rating_means.loc[bank_name], sentiment_means.loc[bank_name]
+    print(f"\n--- Approximate Analysis for {bank_name} "
+          f"(sample of {int(rating['n'])} / {int(rating['N'])} reviews) ---")
+    print(f"Average Rating: {format_estimate(rating['mean'], rating['ci'])} (95% CI)")
+    print(f"Average Sentiment Score: {format_estimate(sentiment['mean'], sentiment['ci'])} (95% CI)")
+    
+    shares = sentiment_shares[sentiment_shares['stratum'] == bank_name]
+    if not shares.empty:
+        print("Sentiment Distribution: " + ", ".join(
+            f"{row.value} {row.proportion * 100:.1f}% ± {row.ci * 100:.1f}" for row in shares.itertuples()))
+    
+    themes = sketches.themes.get(bank_name)
+    if themes is not None:
+        print(f"\nTop Themes ({themes.total} theme mentions, any count over by at most {themes.error_bound():.0f}):")
+        for theme, count, error in themes.top(top_n):
+            print(f"  {theme}: {count} (error ≤ {error})")
+    
+    for title, summaries in (('Top Drivers (Themes in Positive Reviews', sketches.drivers),
+                             ('Top Pain Points (Themes in Negative Reviews', sketches.pain_points)):
+        summary = summaries.get(bank_name)
+        if summary is None:
+            continue
+        print(f"\n{title} - {summary.total} reviews):")
+        for themes, count, error in summary.top(top_n):
+            print(f"  {themes}: {count} (error ≤ {error})")
+    
+    return {
+        'bank': bank_name,
+        'avg_rating': rating['mean'],
+        'avg_rating_ci': rating['ci'],
+        'avg_sentiment': sentiment['mean'],
+        'avg_sentiment_ci': sentiment['ci'],
+        'sample_size': int(rating['n']),
+        'reviews': int(rating['N'])
+    }
+
+def approximate_report(data_path, sample_size=2000, report=True):
+    """Per-bank insights from one chunked pass of sampling and sketching"""
+    sketches = sketch_csv(data_path, sample_size=sample_size)
+    record_rows(rows_in=sum(sketches.sample.population.values()))
+    if not report:
+        return []
+    
+    rating_means = sketches.sample.estimate_means('rating')
+    sentiment_means = sketches.sample.estimate_means('sentiment_score')
+    sentiment_shares = sketches.sample.estimate_proportions('sentiment_label')
+    stats = [analyze_bank_approximate(sketches, bank, rating_means, sentiment_means, sentiment_shares)
+             for bank in sketches.sample.population]
+    
+    counts = sketches.theme_counts
+    print(f"\n--- Theme Mentions, All Banks (Count-Min: over by at most {counts.error_bound():.0f} "
+          f"with probability {1 - counts.delta:.3f}) ---")
+    for theme in sorted(THEME_KEYWORDS, key=counts.estimate, reverse=True):
+        print(f"  {theme}: {counts.estimate(theme)}")
+    return stats
+
+def compute_comparison_aggregates(df):
+    """Precompute the small tables the comparison figures are drawn from"""
+    bank_order = list(df['bank'].unique())
+    
+    avg_sentiment = (df.groupby('bank')['sentiment_score'].mean()
+                     .reindex(bank_order).reset_index())
+    rating_counts = df.groupby(['rating', 'bank']).size().reset_index(name='count')
+    
+    # Count themes for Negative reviews per bank, limited to the top 10 themes
+    neg_df = df[df['rating'] <= 2]
+    pain_order = list(neg_df['identified_themes'].value_counts().index[:10])
+    pain_counts = (neg_df[neg_df['identified_themes'].isin(pain_order)]
+                   .groupby(['identified_themes', 'bank']).size().reset_index(name='count'))
+    
+    return {
+        'bank_order': bank_order,
+        'avg_sentiment': avg_sentiment,
+        'rating_counts': rating_counts,
+        'pain_order': pain_order,
+        'pain_counts': pain_counts
+    }
+
+def plot_avg_sentiment(agg):
+    """Average Sentiment by Bank"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
+    fig = plt.figure(figsize=(10, 6))
+    sns.barplot(x='bank', y='sentiment_score', data=agg['avg_sentiment'], order=agg['bank_order'])
     plt.title('Average Sentiment Score by Bank')
     plt.ylabel('Average Sentiment Score')
-    plt.savefig(os.path.join(output_dir, 'avg_sentiment_by_bank.png'))
-    plt.close()
+    return fig
+
+def plot_rating_distribution(agg):
+    """Rating Distribution by Bank"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
     
-    # 2. Rating Distribution by Bank
-    plt.figure(figsize=(10, 6))
-    sns.countplot(x='rating', hue='bank', data=df)
+    fig = plt.figure(figsize=(10, 6))
+    sns.barplot(x='rating', y='count', hue='bank', data=agg['rating_counts'], hue_order=agg['bank_order'])
     plt.title('Rating Distribution by Bank')
-    plt.savefig(os.path.join(output_dir, 'rating_distribution_by_bank.png'))
-    plt.close()
+    return fig
+
+def plot_pain_points(agg):
+    """Theme Frequency in Negative reviews by Bank"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
     
-    # 3. Theme Frequency by Sentiment (Positive vs Negative)
-    # We need to melt or restructure data for this
-    # Let's just do a simple count of themes for Negative reviews per bank
-    neg_df = df[df['rating'] <= 2]
-    if not neg_df.empty:
-        plt.figure(figsize=(12, 8))
-        sns.countplot(y='identified_themes', hue='bank', data=neg_df, order=neg_df['identified_themes'].value_counts().index[:10])
-        plt.title('Top Pain Point Themes (Negative Reviews) by Bank')
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_dir, 'pain_points_by_bank.png'))
-        plt.close()
+    fig = plt.figure(figsize=(12, 8))
+    sns.barplot(y='identified_themes', x='count', hue='bank', data=agg['pain_counts'],
+                order=agg['pain_order'], hue_order=agg['bank_order'])
+    plt.title('Top Pain Point Themes (Negative Reviews) by Bank')
+    plt.tight_layout()
+    return fig
+
+def generate_comparison_plots(df, output_dir, preview=False):
+    agg = compute_comparison_aggregates(df)
+    
+    specs = [
+        figure_spec('avg_sentiment_by_bank.png', plot_avg_sentiment, agg, dpi=100),
+        figure_spec('rating_distribution_by_bank.png', plot_rating_distribution, agg, dpi=100)
+    ]
+    if agg['pain_order']:
+        specs.append(figure_spec('pain_points_by_bank.png', plot_pain_points, agg, dpi=100))
+    
+    render_figures(specs, output_dir=output_dir, preview=preview)
 
-def main():
+@instrument('insights')
+def main(plots=True, report=True, preview=False, approximate=False, sample_size=2000):
     data_path = 'data/reviews_with_themes.csv'
     output_dir = 'visualizations'
     
     if not os.path.exists(data_path):
         print("Data file not found.")
+        record_failure()
         return
+    
+    if approximate:
+        stats = approximate_report(data_path, sample_size=sample_size, report=report)
+        if plots:
+            print("\nSkipping visualizations: they need exact counts, run without approximate mode.")
+        return stats
         
     df = load_data(data_path)
+    record_rows(rows_in=len(df))
     
     banks = df['bank'].unique()
     stats = []
     
-    for bank in banks:
-        avg_rating, avg_sentiment = analyze_bank(df, bank)
-        stats.append({'bank': bank, 'avg_rating': avg_rating, 'avg_sentiment': avg_sentiment})
-        
-    generate_comparison_plots(df, output_dir)
-    print("\nVisualizations generated in 'visualizations/' directory.")
+    if report:
+        for bank in banks:
+            avg_rating, avg_sentiment = analyze_bank(df, bank)
+            stats.append({'bank': bank, 'avg_rating': avg_rating, 'avg_sentiment': avg_sentiment})
+    
+    if plots:
+        generate_comparison_plots(df, output_dir, preview=preview)
+        print("\nVisualizations generated in 'visualizations/' directory.")
+    
+    return stats
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,284 @@
+"""
+Pipeline Instrumentation for Bank App Reviews
+Wraps pipeline stages to record wall time, CPU time, peak RSS, rows in/out
+and rows/sec, and emits them as JSON lines and/or Prometheus text format
+
+Emission is off unless configured, either with configure() or through
+environment variables:
+    PIPELINE_METRICS_FILE     JSON-lines file to append to ('-' for stderr)
+    PIPELINE_PROMETHEUS_FILE  Prometheus text-format file, rewritten after each stage
+    PIPELINE_PROFILE          '1' to run the sampling profiler during stages
+    PIPELINE_PROFILE_DIR      directory for collapsed-stack profiles (flamegraph input)
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import socket
+import resource
+import functools
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+RSS_SAMPLE_INTERVAL = 0.01
+PROFILE_SAMPLE_INTERVAL = 0.005
+
+_config = {
+    'metrics_path': os.environ.get('PIPELINE_METRICS_FILE'),
+    'prometheus_path': os.environ.get('PIPELINE_PROMETHEUS_FILE'),
+    'profile': os.environ.get('PIPELINE_PROFILE') == '1',
+    'profile_dir': os.environ.get('PIPELINE_PROFILE_DIR')
+}
+
+# Innermost running stage record, so record_rows() can reach it
+_current_stage = ContextVar('current_stage', default=None)
+
+# Latest record per stage, rendered into the Prometheus file
+_latest = {}
+
+# Code objects of functions registered with @hot_function
+_hot_code = {}
+
+def configure(metrics_path=None, prometheus_path=None, profile=None, profile_dir=None):
+    """Override the environment-derived settings; None leaves a setting unchanged"""
+    for key, value in (('metrics_path', metrics_path), ('prometheus_path', prometheus_path),
+                       ('profile', profile), ('profile_dir', profile_dir)):
+        if value is not None:
+            _config[key] = value
+
+def enabled():
+    return bool(_config['metrics_path'] or _config['prometheus_path'] or _config['profile'])
+
+def hot_function(fn):
+    """
+    Mark a per-row function the sampling profiler should report on
+    Returns `fn` unchanged, so there is no per-call overhead
+    """
+    _hot_code[fn.__code__] = fn.__name__
+    return fn
+
+def record_rows(rows_in=None, rows_out=None):
+    """Report row counts for the running stage (no-op outside a stage)"""
+    record = _current_stage.get()
+    if record is None:
+        return
+    if rows_in is not None:
+        record['rows_in'] = int(rows_in)
+    if rows_out is not None:
+        record['rows_out'] = int(rows_out)
+
+def record_failure():
+    """Mark the running stage as failed, for stages that handle their own errors"""
+    record = _current_stage.get()
+    if record is not None:
+        record['failed'] = True
+
+def _current_rss():
+    """Resident set size in bytes, or None where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _max_rss():
+    """Process-lifetime peak RSS in bytes"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+class _Sampler(threading.Thread):
+    """Background thread tracking peak RSS and, optionally, stack samples of one thread"""
+
+    def __init__(self, target_ident, profile):
+        super().__init__(daemon=True)
+        self.target_ident = target_ident
+        self.profile = profile
+        self.interval = PROFILE_SAMPLE_INTERVAL if profile else RSS_SAMPLE_INTERVAL
+        self.peak_rss = _current_rss()
+        self.stacks = Counter()
+        self.hot = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            rss = _current_rss()
+            if rss is not None and (self.peak_rss is None or rss > self.peak_rss):
+                self.peak_rss = rss
+            if self.profile:
+                self._sample_stack()
+
+    def _sample_stack(self):
+        frame = sys._current_frames().get(self.target_ident)
+        if frame is None:
+            return
+        names = []
+        hot_seen = set()
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            if code in _hot_code:
+                hot_seen.add(_hot_code[code])
+            frame = frame.f_back
+        self.samples += 1
+        self.stacks[';'.join(reversed(names))] += 1
+        self.hot.update(hot_seen)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+def _profile_summary(sampler, stage):
+    """Share of samples spent inside each hot function, plus the busiest leaf frames"""
+    summary = {
+        'samples': sampler.samples,
+        'interval_s': sampler.interval,
+        'hot_functions': {
+            name: round(count / sampler.samples, 4) for name, count in sampler.hot.most_common()
+        } if sampler.samples else {}
+    }
+
+    # Leaf frame = where the sampled thread was actually executing
+    leaves = Counter()
+    for stack, count in sampler.stacks.items():
+        leaves[stack.rsplit(';', 1)[-1]] += count
+    summary['top_frames'] = [{'frame': frame, 'samples': count} for frame, count in leaves.most_common(10)]
+
+    if _config['profile_dir'] and sampler.stacks:
+        os.makedirs(_config['profile_dir'], exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        path = os.path.join(_config['profile_dir'], f"{stage}-{stamp}.folded")
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in sampler.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        summary['folded_stacks'] = path
+    return summary
+
+def _emit_json(record):
+    line = json.dumps(record, default=str)
+    if _config['metrics_path'] == '-':
+        print(line, file=sys.stderr)
+        return
+    directory = os.path.dirname(_config['metrics_path'])
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(_config['metrics_path'], 'a', encoding='utf-8') as f:
+        f.write(line + '\n')
+
+PROMETHEUS_METRICS = [
+    ('wall_seconds', 'wall_s', 'Wall-clock duration of the last run of the stage'),
+    ('cpu_seconds', 'cpu_s', 'Process CPU time of the last run of the stage'),
+    ('peak_rss_bytes', 'peak_rss_bytes', 'Peak resident set size during the last run of the stage'),
+    ('rows_in', 'rows_in', 'Rows read by the last run of the stage'),
+    ('rows_out', 'rows_out', 'Rows produced by the last run of the stage'),
+    ('rows_per_second', 'rows_per_s', 'Throughput of the last run of the stage'),
+    ('last_success', 'success', '1 if the last run of the stage succeeded, else 0'),
+    ('last_run_timestamp_seconds', 'finished_unix', 'Unix time the last run of the stage finished')
+]
+
+_PROMETHEUS_SAMPLE = re.compile(r'^(\w+)\{stage="([^"]*)"\} (\S+)$')
+
+def format_prometheus(records):
+    """Render the latest record of each stage in Prometheus text exposition format"""
+    lines = []
+    for metric, key, help_text in PROMETHEUS_METRICS:
+        name = f"pipeline_stage_{metric}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for stage, record in sorted(records.items()):
+            value = record.get(key)
+            if value is None:
+                continue
+            lines.append(f'{name}{{stage="{stage}"}} {float(value)!r}')
+    return '\n'.join(lines) + '\n'
+
+def _read_prometheus(path):
+    """Recover per-stage records from an existing Prometheus file"""
+    keys = {f"pipeline_stage_{metric}": key for metric, key, _ in PROMETHEUS_METRICS}
+    records = {}
+    if not os.path.exists(path):
+        return records
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            match = _PROMETHEUS_SAMPLE.match(line.strip())
+            if match and match.group(1) in keys:
+                records.setdefault(match.group(2), {})[keys[match.group(1)]] = float(match.group(3))
+    return records
+
+def _write_prometheus():
+    path = _config['prometheus_path']
+    # Keep stages recorded by earlier processes (one CLI run per stage)
+    records = _read_prometheus(path)
+    records.update(_latest)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Write then rename so a scraper never reads a half-written file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(format_prometheus(records))
+    os.replace(tmp_path, path)
+
+def instrument(stage):
+    """
+    Decorator recording metrics for one pipeline stage
+    rows_out defaults to len() of the return value when it has one; stages
+    report anything else through record_rows(), and errors they catch
+    themselves through record_failure()
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not enabled():
+                return fn(*args, **kwargs)
+
+            record = {
+                'stage': stage,
+                'function': f"{fn.__module__}.{fn.__qualname__}",
+                'host': socket.gethostname(),
+                'pid': os.getpid(),
+                'started': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+                'rows_in': None,
+                'rows_out': None
+            }
+            token = _current_stage.set(record)
+            sampler = _Sampler(threading.get_ident(), _config['profile'])
+            sampler.start()
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            success = False
+            try:
+                result = fn(*args, **kwargs)
+                success = not record.pop('failed', False)
+                if record['rows_out'] is None and hasattr(result, '__len__'):
+                    record['rows_out'] = len(result)
+                return result
+            finally:
+                wall = time.perf_counter() - wall_start
+                cpu = time.process_time() - cpu_start
+                sampler.stop()
+                _current_stage.reset(token)
+
+                rows = record['rows_in'] if record['rows_in'] is not None else record['rows_out']
+                record.update({
+                    'success': int(success),
+                    'wall_s': round(wall, 6),
+                    'cpu_s': round(cpu, 6),
+                    'peak_rss_bytes': sampler.peak_rss if sampler.peak_rss is not None else _max_rss(),
+                    'rows_per_s': round(rows / wall, 2) if rows is not None and wall > 0 else None,
+                    'finished_unix': round(time.time(), 3)
+                })
+                if _config['profile']:
+                    record['profile'] = _profile_summary(sampler, stage)
+
+                _latest[stage] = record
+                if _config['metrics_path']:
+                    _emit_json(record)
+                if _config['prometheus_path']:
+                    _write_prometheus()
+        return wrapper
+    return decorator
@@ -1,6 +1,7 @@
 import pandas as pd
 from sqlalchemy import create_engine, text
 import os
+from instrumentation import instrument, record_rows, record_failure
 
 # Database connection parameters
 DB_USER = 'db_user'
@@ -40,13 +41,16 @@ def create_tables(engine):
         connection.commit()
     print("Tables created successfully.")
 
+@instrument('load')
 def load_data(file_path, engine):
     """Loads data from CSV into the database."""
     if not os.path.exists(file_path):
         print(f"Error: File {file_path} not found.")
+        record_failure()
         return
 
     df = pd.read_csv(file_path)
+    record_rows(rows_in=len(df))
     
     # Ensure date is datetime
     df['date'] = pd.to_datetime(df['date'])
@@ -97,6 +101,7 @@ def load_data(file_path, engine):
     
     # Insert reviews
     reviews_df.to_sql('reviews', engine, if_exists='append', index=False)
+    record_rows(rows_out=len(reviews_df))
     print(f"Inserted {len(reviews_df)} reviews.")
 
 def verify_data(engine):
@@ -111,7 +116,7 @@ def verify_data(engine):
         for row in result:
             print(f"{row[0]}: {row[1]}")
 
-if __name__ == "__main__":
+def main():
     engine = create_engine(DATABASE_URL)
     create_tables(engine)
     # Assuming script is run from prod/scripts/ or prod/
@@ -120,3 +125,6 @@ if __name__ == "__main__":
     print(f"Loading data from: {data_path}")
     load_data(data_path, engine)
     verify_data(engine)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Figure Rendering for Bank App Reviews
+Renders visualization figures from small precomputed aggregates
+Figures are drawn in a process pool on the headless Agg backend and
+skipped when their input aggregate is unchanged since the last render;
+the calling process's matplotlib backend is left alone
+"""
+
+import os
+import json
+import pickle
+import inspect
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+CACHE_FILENAME = '.render_cache.json'
+PREVIEW_DPI = 72
+PREVIEW_SUBDIR = 'preview'
+
+def figure_spec(filename, plot, data, dpi=300, **savefig_kwargs):
+    """
+    Describe one figure to render
+    plot: module-level function taking `data` and returning a matplotlib Figure
+    data: small precomputed aggregate (dict, Series or DataFrame)
+    """
+    return {
+        'filename': filename,
+        'plot': plot,
+        'data': data,
+        'dpi': dpi,
+        'savefig_kwargs': savefig_kwargs
+    }
+
+def _code_fingerprint(code):
+    """Bytecode plus constants and names, recursing into nested code objects"""
+    parts = [code.co_code, repr(code.co_names).encode('utf-8')]
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            parts.append(_code_fingerprint(const))
+        else:
+            parts.append(repr(const).encode('utf-8'))
+    return b'\x00'.join(parts)
+
+def plot_fingerprint(plot):
+    """
+    Identify a plot function's definition, so editing a title, label,
+    colour or figure size invalidates its cached figure
+    """
+    try:
+        return inspect.getsource(plot).encode('utf-8')
+    except (OSError, TypeError):
+        return _code_fingerprint(plot.__code__)
+
+def aggregate_hash(spec, dpi):
+    """Hash everything that determines a figure's pixels"""
+    h = hashlib.sha256()
+    h.update(spec['filename'].encode('utf-8'))
+    h.update(str(dpi).encode('utf-8'))
+    h.update(repr(sorted(spec['savefig_kwargs'].items())).encode('utf-8'))
+    h.update(spec['plot'].__qualname__.encode('utf-8'))
+    h.update(plot_fingerprint(spec['plot']))
+    h.update(pickle.dumps(spec['data'], protocol=4))
+    return h.hexdigest()
+
+def _load_cache(cache_path):
+    if not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_cache(cache_path, cache):
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+
+def _init_worker():
+    """Make sure every worker draws on the headless backend"""
+    import matplotlib
+    matplotlib.use('Agg')
+
+def _render_figure(plot, data, path, dpi, savefig_kwargs):
+    """
+    Build one figure from its aggregate and write it to disk
+    Also runs in the calling process, so it saves through an explicit Agg
+    canvas instead of switching that process's backend
+    """
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    # Isolate style changes made by one figure from the next one
+    # rendered in the same worker
+    with plt.rc_context():
+        fig = plot(data)
+        try:
+            FigureCanvasAgg(fig)
+            fig.savefig(path, dpi=dpi, **savefig_kwargs)
+        finally:
+            plt.close(fig)
+    return path
+
+def render_figures(specs, output_dir='visualizations', preview=False, max_workers=None, force=False):
+    """
+    Render figures in parallel, skipping those whose aggregate is unchanged
+    preview: render at PREVIEW_DPI into `<output_dir>/preview/` for fast iteration
+    force: re-render even when the cached hash matches
+    Returns: dict mapping filename to 'rendered' or 'unchanged'
+    """
+    target_dir = os.path.join(output_dir, PREVIEW_SUBDIR) if preview else output_dir
+    os.makedirs(target_dir, exist_ok=True)
+
+    cache_path = os.path.join(target_dir, CACHE_FILENAME)
+    cache = _load_cache(cache_path)
+
+    status = {}
+    pending = []
+    for spec in specs:
+        dpi = min(spec['dpi'], PREVIEW_DPI) if preview else spec['dpi']
+        path = os.path.join(target_dir, spec['filename'])
+        digest = aggregate_hash(spec, dpi)
+
+        if not force and cache.get(spec['filename']) == digest and os.path.exists(path):
+            status[spec['filename']] = 'unchanged'
+            print(f"• {spec['filename']} unchanged, skipped")
+            continue
+
+        pending.append((spec, path, dpi, digest))
+
+    try:
+        if len(pending) == 1 or max_workers == 1:
+            # Not worth the pool start-up cost
+            for spec, path, dpi, digest in pending:
+                _render_figure(spec['plot'], spec['data'], path, dpi, spec['savefig_kwargs'])
+                cache[spec['filename']] = digest
+                status[spec['filename']] = 'rendered'
+                print(f"✓ Saved {spec['filename']}")
+        elif pending:
+            workers = min(len(pending), max_workers or os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                futures = [
+                    (spec, digest, pool.submit(_render_figure, spec['plot'], spec['data'],
+                                               path, dpi, spec['savefig_kwargs']))
+                    for spec, path, dpi, digest in pending
+                ]
+                for spec, digest, future in futures:
+                    future.result()
+                    cache[spec['filename']] = digest
+                    status[spec['filename']] = 'rendered'
+                    print(f"✓ Saved {spec['filename']}")
+    finally:
+        _save_cache(cache_path, cache)
+
+    return status
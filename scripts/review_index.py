@@ -0,0 +1,236 @@
+"""
+Full-Text Review Index for Bank App Reviews
+Builds a persistent SQLite FTS5 index over review text, with bank, rating,
+date and theme filters, so lookups like "otp" or "transfer" take
+milliseconds instead of scanning reviews_with_themes.csv
+
+Usage:
+    python scripts/review_index.py build
+    python scripts/review_index.py search otp --bank CBE --max-rating 2
+    python scripts/review_index.py search "send money" --theme "Transaction Performance" --since 2024-06-01
+"""
+
+import os
+import re
+import sqlite3
+import argparse
+
+import pandas as pd
+
+INDEX_PATH = 'data/reviews_index.sqlite'
+
+SCHEMA = [
+    """
+    CREATE TABLE reviews (
+        review_id INTEGER PRIMARY KEY,
+        bank TEXT,
+        rating INTEGER,
+        review_date TEXT,
+        sentiment_label TEXT,
+        sentiment_score REAL,
+        review TEXT
+    )
+    """,
+    "CREATE INDEX idx_reviews_bank_date ON reviews (bank, review_date)",
+    "CREATE INDEX idx_reviews_rating ON reviews (rating)",
+    # Theme postings: one row per (review, theme)
+    """
+    CREATE TABLE review_themes (
+        review_id INTEGER REFERENCES reviews(review_id),
+        bank TEXT,
+        theme TEXT
+    )
+    """,
+    "CREATE INDEX idx_review_themes ON review_themes (theme, bank, review_id)",
+    # External-content FTS5 table: token postings without a second copy of the text
+    """
+    CREATE VIRTUAL TABLE reviews_fts USING fts5(
+        review, content='reviews', content_rowid='review_id', tokenize='unicode61'
+    )
+    """
+]
+
+def _theme_lists(df):
+    """Themes per row as lists, from the in-memory list column or the CSV string column"""
+    if 'themes' in df.columns and df['themes'].map(lambda x: isinstance(x, list)).all():
+        return df['themes']
+    names = df['identified_themes'] if 'identified_themes' in df.columns else df['theme_names']
+    return names.fillna('No Theme').map(
+        lambda x: [] if x == 'No Theme' else [theme.strip() for theme in str(x).split(',')]
+    )
+
+def build_index(df, index_path=INDEX_PATH):
+    """
+    (Re)build the index from a reviews-with-themes frame
+    review_id is the frame's index, matching the row numbers the report prints
+    """
+    directory = os.path.dirname(index_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # Build into a temporary file and swap it in, so readers never see a partial index
+    tmp_path = f"{index_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        for statement in SCHEMA:
+            conn.execute(statement)
+
+        rows = pd.DataFrame({
+            'review_id': df.index.astype(int),
+            'bank': df['bank'],
+            'rating': df['rating'],
+            'review_date': df['date'] if 'date' in df.columns else None,
+            'sentiment_label': df['sentiment_label'] if 'sentiment_label' in df.columns else None,
+            'sentiment_score': df['sentiment_score'] if 'sentiment_score' in df.columns else None,
+            'review': df['review'].fillna('').astype(str)
+        })
+        conn.executemany(
+            "INSERT INTO reviews VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows.astype(object).where(rows.notna(), None).itertuples(index=False, name=None)
+        )
+
+        themes = _theme_lists(df)
+        conn.executemany(
+            "INSERT INTO review_themes VALUES (?, ?, ?)",
+            ((int(review_id), bank, theme)
+             for review_id, bank, review_themes in zip(df.index, df['bank'], themes)
+             for theme in review_themes)
+        )
+
+        conn.execute("INSERT INTO reviews_fts (reviews_fts) VALUES ('rebuild')")
+        conn.commit()
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, index_path)
+    return len(df)
+
+def connect(index_path=INDEX_PATH):
+    if not os.path.exists(index_path):
+        raise FileNotFoundError(f"{index_path} not found. Run `python scripts/review_index.py build` first.")
+    conn = sqlite3.connect(index_path)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+def to_match_query(text):
+    """
+    Turn free text into an FTS5 query: every word must appear, quoted words as phrases
+    Terms without a letter or digit are dropped, since the tokenizer would find no word in them
+    """
+    phrases = re.findall(r'"([^"]+)"|(\S+)', text)
+    terms = []
+    for phrase, word in phrases:
+        term = (phrase or word).replace('"', '')
+        if re.search(r'[^\W_]', term):
+            terms.append(f'"{term}"')
+    return ' AND '.join(terms)
+
+def search(conn, query=None, bank=None, theme=None, min_rating=None, max_rating=None,
+           since=None, until=None, sentiment=None, limit=20, raw=False):
+    """
+    Find reviews matching `query` (free text, or FTS5 syntax when raw=True)
+    and the given filters; without a query, filters alone select reviews
+    Raises ValueError for a free-text query with no words, and
+    sqlite3.OperationalError for invalid raw FTS5 syntax
+    Returns: list of dicts, best text matches first
+    """
+    clauses, params = [], []
+    joins = ''
+    order = 'r.review_id'
+
+    if query:
+        match = query if raw else to_match_query(query)
+        if not match:
+            raise ValueError(f"query {query!r} has no words to search for")
+        joins += ' JOIN reviews_fts ON reviews_fts.rowid = r.review_id'
+        clauses.append('reviews_fts MATCH ?')
+        params.append(match)
+        order = 'reviews_fts.rank'
+    if theme:
+        clauses.append('r.review_id IN (SELECT review_id FROM review_themes WHERE theme = ?)')
+        params.append(theme)
+    for column, op, value in (('r.bank', '=', bank), ('r.rating', '>=', min_rating),
+                              ('r.rating', '<=', max_rating), ('r.review_date', '>=', since),
+                              ('r.review_date', '<=', until), ('r.sentiment_label', '=', sentiment)):
+        if value is not None:
+            clauses.append(f'{column} {op} ?')
+            params.append(value)
+
+    sql = f"SELECT r.* FROM reviews r{joins}"
+    if clauses:
+        sql += ' WHERE ' + ' AND '.join(clauses)
+    sql += f' ORDER BY {order} LIMIT ?'
+    params.append(limit)
+
+    return [dict(row) for row in conn.execute(sql, params)]
+
+def theme_examples(conn, bank, theme, limit=3):
+    """First `limit` reviews of `bank` tagged with `theme`, in corpus order"""
+    rows = conn.execute(
+        """
+        SELECT r.* FROM review_themes t JOIN reviews r ON r.review_id = t.review_id
+        WHERE t.theme = ? AND t.bank = ?
+        ORDER BY t.review_id LIMIT ?
+        """,
+        (theme, bank, limit)
+    )
+    return [dict(row) for row in rows]
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Build and query the review full-text index")
+    parser.add_argument('--index', default=INDEX_PATH, help=f"Index file (default: {INDEX_PATH})")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help="Build the index from a reviews-with-themes CSV")
+    build.add_argument('--input', default='data/reviews_with_themes.csv')
+
+    query = subparsers.add_parser('search', help="Search reviews")
+    query.add_argument('query', nargs='?', help="Words that must all appear; quote phrases")
+    query.add_argument('--bank')
+    query.add_argument('--theme')
+    query.add_argument('--min-rating', type=int)
+    query.add_argument('--max-rating', type=int)
+    query.add_argument('--since', help="YYYY-MM-DD")
+    query.add_argument('--until', help="YYYY-MM-DD")
+    query.add_argument('--sentiment', choices=['positive', 'neutral', 'negative'])
+    query.add_argument('--limit', type=int, default=20)
+    query.add_argument('--raw', action='store_true', help="Pass the query to FTS5 unchanged")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == 'build':
+        if not os.path.exists(args.input):
+            print(f"Error: {args.input} not found. Run scripts/thematic_analysis.py first.")
+            return
+        count = build_index(pd.read_csv(args.input), args.index)
+        print(f"✓ Indexed {count} reviews into {args.index}")
+        return
+
+    conn = connect(args.index)
+    try:
+        results = search(conn, args.query, bank=args.bank, theme=args.theme,
+                         min_rating=args.min_rating, max_rating=args.max_rating,
+                         since=args.since, until=args.until, sentiment=args.sentiment,
+                         limit=args.limit, raw=args.raw)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    except sqlite3.OperationalError as e:
+        print(f"Error: invalid search query ({e})")
+        return
+    finally:
+        conn.close()
+
+    for row in results:
+        print(f"[{row['bank']}] {row['review_date']}  Rating: {row['rating']}  "
+              f"Sentiment: {row['sentiment_label']}")
+        print(f"  {row['review']}\n")
+    print(f"{len(results)} review(s) found")
+
+if __name__ == "__main__":
+    main()
@@ -6,14 +6,21 @@ Uses VADER sentiment analyzer to compute sentiment scores for reviews
 
 import pandas as pd
 import numpy as np
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-import matplotlib.pyplot as plt
-import seaborn as sns
-from pathlib import Path
+from rendering import figure_spec, render_figures
+from instrumentation import instrument, record_rows, hot_function
 
-# Initialize VADER sentiment analyzer
-analyzer = SentimentIntensityAnalyzer()
+# VADER sentiment analyzer, built on first use so importing this module stays cheap
+_analyzer = None
 
+def get_analyzer():
+    """Return the shared VADER analyzer, creating it on first call"""
+    global _analyzer
+    if _analyzer is None:
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+        _analyzer = SentimentIntensityAnalyzer()
+    return _analyzer
+
+@hot_function
 def analyze_sentiment(text):
     """
     Analyze sentiment of a text using VADER
@@ -22,7 +29,7 @@ def analyze_sentiment(text):
     if pd.isna(text) or text == '':
         return {'pos': 0, 'neg': 0, 'neu': 1, 'compound': 0}
     
-    scores = analyzer.polarity_scores(str(text))
+    scores = get_analyzer().polarity_scores(str(text))
     return scores
 
 def classify_sentiment(compound_score):
@@ -36,11 +43,13 @@ def classify_sentiment(compound_score):
     else:
         return 'neutral'
 
-def main():
+@instrument('sentiment')
+def main(plots=True, report=True, preview=False):
     # Load data
     print("Loading reviews data...")
     df = pd.read_csv('data/reviews_cleaned.csv')
     print(f"Loaded {len(df)} reviews")
+    record_rows(rows_in=len(df))
     
     # Apply sentiment analysis
     print("\nAnalyzing sentiment...")
@@ -55,7 +64,23 @@ def main():
     # Classify sentiment
     df['sentiment_label'] = df['sentiment_score'].apply(classify_sentiment)
     
-    # Print summary statistics
+    if report:
+        print_summary(df)
+    
+    # Save results
+    output_path = 'data/reviews_with_sentiment.csv'
+    df.to_csv(output_path, index=False)
+    print(f"\n✓ Saved results to {output_path}")
+    
+    # Create visualizations
+    if plots:
+        print("\nCreating visualizations...")
+        create_visualizations(df, preview=preview)
+    
+    return df
+
+def print_summary(df):
+    """Print summary statistics"""
     print("\n=== Sentiment Analysis Summary ===")
     print(f"\nTotal reviews analyzed: {len(df)}")
     print(f"Reviews with sentiment scores: {df['sentiment_score'].notna().sum()}")
@@ -73,34 +98,27 @@ def main():
     
     print("\n=== Sentiment by Rating ===")
     print(df.groupby('rating')['sentiment_score'].mean().round(3))
-    
-    # Save results
-    output_path = 'data/reviews_with_sentiment.csv'
-    df.to_csv(output_path, index=False)
-    print(f"\n✓ Saved results to {output_path}")
-    
-    # Create visualizations
-    print("\nCreating visualizations...")
-    create_visualizations(df)
-    
-    return df
 
-def create_visualizations(df):
-    """Create and save sentiment visualizations"""
+def compute_sentiment_aggregates(df):
+    """Precompute the small tables the sentiment figures are drawn from"""
+    return {
+        'bank_order': list(df['bank'].unique()),
+        'counts_by_bank': pd.crosstab(df['bank'], df['sentiment_label']),
+        'mean_by_bank': df.groupby('bank')['sentiment_score'].mean(),
+        'mean_by_rating': df.groupby('rating')['sentiment_score'].mean(),
+        'label_counts': df['sentiment_label'].value_counts()
+    }
+
+def plot_sentiment_overview(agg):
+    """Sentiment distribution overview (2x2 grid)"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
     
-    # Set style
     sns.set_style("whitegrid")
-    plt.rcParams['figure.figsize'] = (12, 8)
-    
-    # Create output directory for plots
-    Path('visualizations').mkdir(exist_ok=True)
-    
-    # 1. Sentiment distribution by bank
     fig, axes = plt.subplots(2, 2, figsize=(15, 10))
     
     # Sentiment counts by bank
-    sentiment_counts = pd.crosstab(df['bank'], df['sentiment_label'])
-    sentiment_counts.plot(kind='bar', ax=axes[0, 0], color=['#d62728', '#7f7f7f', '#2ca02c'])
+    agg['counts_by_bank'].plot(kind='bar', ax=axes[0, 0], color=['#d62728', '#7f7f7f', '#2ca02c'])
     axes[0, 0].set_title('Sentiment Distribution by Bank', fontsize=14, fontweight='bold')
     axes[0, 0].set_xlabel('Bank')
     axes[0, 0].set_ylabel('Count')
@@ -108,7 +126,7 @@ def create_visualizations(df):
     axes[0, 0].tick_params(axis='x', rotation=45)
     
     # Average sentiment score by bank
-    df.groupby('bank')['sentiment_score'].mean().plot(kind='bar', ax=axes[0, 1], color='#1f77b4')
+    agg['mean_by_bank'].plot(kind='bar', ax=axes[0, 1], color='#1f77b4')
     axes[0, 1].set_title('Average Sentiment Score by Bank', fontsize=14, fontweight='bold')
     axes[0, 1].set_xlabel('Bank')
     axes[0, 1].set_ylabel('Average Compound Score')
@@ -116,7 +134,7 @@ def create_visualizations(df):
     axes[0, 1].tick_params(axis='x', rotation=45)
     
     # Sentiment by rating
-    rating_sentiment = df.groupby('rating')['sentiment_score'].mean()
+    rating_sentiment = agg['mean_by_rating']
     axes[1, 0].plot(rating_sentiment.index, rating_sentiment.values, marker='o', linewidth=2, markersize=8, color='#ff7f0e')
     axes[1, 0].set_title('Sentiment Score by Rating', fontsize=14, fontweight='bold')
     axes[1, 0].set_xlabel('Rating')
@@ -125,7 +143,7 @@ def create_visualizations(df):
     axes[1, 0].set_xticks([1, 2, 3, 4, 5])
     
     # Sentiment distribution (overall)
-    sentiment_dist = df['sentiment_label'].value_counts()
+    sentiment_dist = agg['label_counts']
     colors = {'positive': '#2ca02c', 'neutral': '#7f7f7f', 'negative': '#d62728'}
     sentiment_dist.plot(kind='pie', ax=axes[1, 1], autopct='%1.1f%%', 
                         colors=[colors[label] for label in sentiment_dist.index],
@@ -133,26 +151,26 @@ def create_visualizations(df):
     axes[1, 1].set_title('Overall Sentiment Distribution', fontsize=14, fontweight='bold')
     axes[1, 1].set_ylabel('')
     
-    plt.tight_layout()
-    plt.savefig('visualizations/sentiment_analysis.png', dpi=300, bbox_inches='tight')
-    print("✓ Saved sentiment_analysis.png")
-    plt.close()
+    fig.tight_layout()
+    return fig
+
+def plot_sentiment_by_bank(agg):
+    """Grouped bar chart comparing sentiment counts across banks"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
     
-    # 2. Detailed bank comparison
+    sns.set_style("whitegrid")
     fig, ax = plt.subplots(figsize=(12, 6))
     
     # Prepare data for grouped bar chart
-    banks = df['bank'].unique()
+    banks = agg['bank_order']
+    counts = agg['counts_by_bank'].reindex(index=banks, columns=['positive', 'neutral', 'negative'], fill_value=0)
     x = np.arange(len(banks))
     width = 0.25
     
-    positive = [df[(df['bank'] == bank) & (df['sentiment_label'] == 'positive')].shape[0] for bank in banks]
-    neutral = [df[(df['bank'] == bank) & (df['sentiment_label'] == 'neutral')].shape[0] for bank in banks]
-    negative = [df[(df['bank'] == bank) & (df['sentiment_label'] == 'negative')].shape[0] for bank in banks]
-    
-    ax.bar(x - width, positive, width, label='Positive', color='#2ca02c')
-    ax.bar(x, neutral, width, label='Neutral', color='#7f7f7f')
-    ax.bar(x + width, negative, width, label='Negative', color='#d62728')
+    ax.bar(x - width, counts['positive'], width, label='Positive', color='#2ca02c')
+    ax.bar(x, counts['neutral'], width, label='Neutral', color='#7f7f7f')
+    ax.bar(x + width, counts['negative'], width, label='Negative', color='#d62728')
     
     ax.set_xlabel('Bank', fontweight='bold')
     ax.set_ylabel('Number of Reviews', fontweight='bold')
@@ -162,10 +180,18 @@ def create_visualizations(df):
     ax.legend()
     ax.grid(axis='y', alpha=0.3)
     
-    plt.tight_layout()
-    plt.savefig('visualizations/sentiment_by_bank_detailed.png', dpi=300, bbox_inches='tight')
-    print("✓ Saved sentiment_by_bank_detailed.png")
-    plt.close()
+    fig.tight_layout()
+    return fig
+
+def create_visualizations(df, preview=False):
+    """Create and save sentiment visualizations"""
+    agg = compute_sentiment_aggregates(df)
+    
+    specs = [
+        figure_spec('sentiment_analysis.png', plot_sentiment_overview, agg, dpi=300, bbox_inches='tight'),
+        figure_spec('sentiment_by_bank_detailed.png', plot_sentiment_by_bank, agg, dpi=300, bbox_inches='tight')
+    ]
+    render_figures(specs, output_dir='visualizations', preview=preview)
 
 if __name__ == "__main__":
     df_with_sentiment = main()
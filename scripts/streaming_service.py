@@ -0,0 +1,390 @@
+"""
+Streaming Analysis Service for Bank App Reviews
+Scores new reviews in micro-batches as they arrive and keeps online
+aggregates (per-bank counts, running means, sentiment and theme tallies)
+served over a small local HTTP API
+
+Reviews arrive through either input:
+    - a spool directory of NDJSON files (one review object per line); write
+      files under another name and rename them to *.ndjson when complete,
+      processed files are moved to <spool>/processed/; malformed lines are
+      skipped and saved to <spool>/failed/, as are unreadable files
+    - POST /reviews with a JSON object, a JSON array or NDJSON body
+
+HTTP API:
+    GET  /health            liveness, queue depth and batch latency
+    GET  /aggregates        all banks plus overall totals
+    GET  /aggregates/<bank> one bank
+    POST /reviews           enqueue reviews
+
+Usage:
+    python scripts/streaming_service.py --spool data/spool --port 8765
+"""
+
+import os
+import json
+import math
+import time
+import queue
+import signal
+import shutil
+import argparse
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+from sentiment_analysis import analyze_sentiment, classify_sentiment
+from thematic_analysis import assign_themes
+from instrumentation import instrument, record_rows
+
+SENTIMENT_LABELS = ['positive', 'neutral', 'negative']
+
+def score_review(review):
+    """Run the batch pipeline's sentiment and theme logic on one review record"""
+    text = review.get('review', review.get('content'))
+    if text is None or not str(text).strip():
+        raise ValueError("review has no text")
+    compound = analyze_sentiment(text)['compound']
+    return {
+        'bank': review.get('bank') or 'Unknown',
+        'rating': review.get('rating', review.get('score')),
+        'sentiment_score': compound,
+        'sentiment_label': classify_sentiment(compound),
+        'themes': assign_themes(text)
+    }
+
+def _empty_stats():
+    return {
+        'count': 0,
+        'rated': 0,
+        'mean_rating': 0.0,
+        'mean_sentiment': 0.0,
+        'sentiment_counts': {label: 0 for label in SENTIMENT_LABELS},
+        'theme_counts': {},
+        'no_theme': 0
+    }
+
+def _update_stats(stats, scored):
+    """Fold one scored review into running totals (incremental means)"""
+    stats['count'] += 1
+    stats['mean_sentiment'] += (scored['sentiment_score'] - stats['mean_sentiment']) / stats['count']
+
+    rating = scored['rating']
+    if rating is not None:
+        try:
+            rating = float(rating)
+        except (TypeError, ValueError):
+            rating = None
+    # NaN/inf or out-of-range ratings would poison the running mean; count them as unrated
+    if rating is not None and math.isfinite(rating) and 1 <= rating <= 5:
+        stats['rated'] += 1
+        stats['mean_rating'] += (rating - stats['mean_rating']) / stats['rated']
+
+    stats['sentiment_counts'][scored['sentiment_label']] += 1
+    if scored['themes']:
+        for theme in scored['themes']:
+            stats['theme_counts'][theme] = stats['theme_counts'].get(theme, 0) + 1
+    else:
+        stats['no_theme'] += 1
+
+class OnlineAggregates:
+    """Thread-safe per-bank and overall running aggregates"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.banks = {}
+        self.overall = _empty_stats()
+        self.updated = None
+
+    def update(self, scored_reviews):
+        with self._lock:
+            for scored in scored_reviews:
+                _update_stats(self.banks.setdefault(scored['bank'], _empty_stats()), scored)
+                _update_stats(self.overall, scored)
+            self.updated = datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+    def to_dict(self, bank=None):
+        with self._lock:
+            if bank is not None:
+                stats = self.banks.get(bank)
+                return json.loads(json.dumps(stats)) if stats is not None else None
+            return json.loads(json.dumps({
+                'updated': self.updated,
+                'overall': self.overall,
+                'banks': self.banks
+            }))
+
+    def save(self, path):
+        """Write a snapshot atomically"""
+        data = self.to_dict()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Restore from a snapshot, or start empty if there is none"""
+        aggregates = cls()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            aggregates.overall = data.get('overall', _empty_stats())
+            aggregates.banks = data.get('banks', {})
+            aggregates.updated = data.get('updated')
+        return aggregates
+
+def parse_reviews(body):
+    """Parse a JSON object, JSON array or NDJSON payload into review dicts"""
+    body = body.strip()
+    if not body:
+        return []
+    try:
+        data = json.loads(body)
+        return data if isinstance(data, list) else [data]
+    except ValueError:
+        return [json.loads(line) for line in body.splitlines() if line.strip()]
+
+def parse_review_lines(body):
+    """
+    Lenient parse_reviews for spool files: a malformed NDJSON line is skipped
+    rather than failing the whole payload
+    Returns: (reviews, malformed lines)
+    """
+    try:
+        return parse_reviews(body), []
+    except ValueError:
+        pass
+    reviews, bad_lines = [], []
+    for line in body.splitlines():
+        if not line.strip():
+            continue
+        try:
+            reviews.append(json.loads(line))
+        except ValueError:
+            bad_lines.append(line)
+    return reviews, bad_lines
+
+class StreamingService:
+    """Micro-batch scorer fed from a queue and an optional NDJSON spool directory"""
+
+    def __init__(self, spool_dir=None, snapshot_path='data/stream_aggregates.json',
+                 batch_size=500, batch_interval=1.0, poll_interval=1.0, snapshot_interval=30.0):
+        self.spool_dir = spool_dir
+        self.snapshot_path = snapshot_path
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.poll_interval = poll_interval
+        self.snapshot_interval = snapshot_interval
+
+        self.queue = queue.Queue()
+        self.aggregates = OnlineAggregates.load(snapshot_path) if snapshot_path else OnlineAggregates()
+        self.last_batch = {'size': 0, 'latency_s': None, 'processed': None}
+        self._stop_event = threading.Event()
+        self._threads = []
+
+    def submit(self, reviews):
+        """Enqueue reviews, stamping each with its ingest time"""
+        ingested = time.time()
+        for review in reviews:
+            self.queue.put((ingested, review))
+        return len(reviews)
+
+    @instrument('stream_batch')
+    def process_batch(self, batch):
+        """Score one micro-batch and fold it into the aggregates"""
+        record_rows(rows_in=len(batch))
+        scored = []
+        for _, review in batch:
+            try:
+                scored.append(score_review(review))
+            except Exception as e:
+                print(f"Skipping malformed review: {e}")
+        self.aggregates.update(scored)
+
+        oldest = min(ingested for ingested, _ in batch)
+        self.last_batch = {
+            'size': len(scored),
+            'latency_s': round(time.time() - oldest, 4),
+            'processed': datetime.now(timezone.utc).isoformat(timespec='seconds')
+        }
+        return scored
+
+    def _next_batch(self):
+        """Block for the first review, then collect more until full or batch_interval passes"""
+        try:
+            batch = [self.queue.get(timeout=self.batch_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.batch_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _batch_loop(self):
+        while not self._stop_event.is_set() or not self.queue.empty():
+            batch = self._next_batch()
+            if batch:
+                self.process_batch(batch)
+
+    def _spool_loop(self):
+        processed_dir = os.path.join(self.spool_dir, 'processed')
+        failed_dir = os.path.join(self.spool_dir, 'failed')
+        os.makedirs(processed_dir, exist_ok=True)
+        os.makedirs(failed_dir, exist_ok=True)
+        while not self._stop_event.is_set():
+            files = sorted(
+                (os.path.join(self.spool_dir, name) for name in os.listdir(self.spool_dir)
+                 if name.endswith('.ndjson')),
+                key=os.path.getmtime
+            )
+            for path in files:
+                name = os.path.basename(path)
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        reviews, bad_lines = parse_review_lines(f.read())
+                except (OSError, UnicodeDecodeError) as e:
+                    print(f"Error reading spool file {path}: {e}")
+                    shutil.move(path, os.path.join(failed_dir, name))
+                    continue
+
+                if bad_lines:
+                    print(f"Skipping {len(bad_lines)} malformed line(s) in {path}")
+                    with open(os.path.join(failed_dir, name), 'w', encoding='utf-8') as f:
+                        f.write('\n'.join(bad_lines) + '\n')
+                self.submit(reviews)
+                shutil.move(path, os.path.join(processed_dir, name))
+            self._stop_event.wait(self.poll_interval)
+
+    def _snapshot_loop(self):
+        while not self._stop_event.wait(self.snapshot_interval):
+            self.aggregates.save(self.snapshot_path)
+
+    def start(self):
+        loops = [self._batch_loop]
+        if self.spool_dir:
+            os.makedirs(self.spool_dir, exist_ok=True)
+            loops.append(self._spool_loop)
+        if self.snapshot_path:
+            loops.append(self._snapshot_loop)
+        for loop in loops:
+            thread = threading.Thread(target=loop, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Drain the queue, stop all loops and write a final snapshot"""
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join()
+        if self.snapshot_path:
+            self.aggregates.save(self.snapshot_path)
+
+    def health(self):
+        return {
+            'status': 'ok',
+            'queue_depth': self.queue.qsize(),
+            'last_batch': self.last_batch,
+            'reviews_processed': self.aggregates.overall['count']
+        }
+
+def make_handler(service):
+    """Build a request handler class bound to `service`"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            path = self.path.split('?', 1)[0].rstrip('/')
+            if path == '/health':
+                self._send_json(200, service.health())
+            elif path == '/aggregates':
+                self._send_json(200, service.aggregates.to_dict())
+            elif path.startswith('/aggregates/'):
+                bank = unquote(path[len('/aggregates/'):])
+                stats = service.aggregates.to_dict(bank)
+                if stats is None:
+                    self._send_json(404, {'error': f"Unknown bank: {bank}"})
+                else:
+                    self._send_json(200, stats)
+            else:
+                self._send_json(404, {'error': 'Not found'})
+
+        def do_POST(self):
+            if self.path.rstrip('/') != '/reviews':
+                self._send_json(404, {'error': 'Not found'})
+                return
+            length = int(self.headers.get('Content-Length', 0))
+            try:
+                reviews = parse_reviews(self.rfile.read(length).decode('utf-8'))
+            except ValueError as e:
+                self._send_json(400, {'error': f"Invalid JSON: {e}"})
+                return
+            self._send_json(202, {'queued': service.submit(reviews)})
+
+        def log_message(self, format, *args):
+            # Keep the console for service messages only
+            pass
+
+    return Handler
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+def serve(host='127.0.0.1', port=8765, **service_kwargs):
+    """Run the service until interrupted (Ctrl+C or SIGTERM)"""
+    service = StreamingService(**service_kwargs)
+    service.start()
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    # Treat SIGTERM (kill, systemd, docker stop) like Ctrl+C so the final snapshot is written
+    signal.signal(signal.SIGTERM, _raise_interrupt)
+    print(f"Serving review aggregates on http://{host}:{port} (Ctrl+C to stop)")
+    if service.spool_dir:
+        print(f"Watching spool directory {service.spool_dir}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        server.server_close()
+        service.stop()
+        if service.snapshot_path:
+            print(f"✓ Saved aggregates snapshot to {service.snapshot_path}")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Streaming review scoring service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--spool', help="Directory watched for *.ndjson review files")
+    parser.add_argument('--snapshot', default='data/stream_aggregates.json',
+                        help="Aggregates snapshot file, restored on start (default: data/stream_aggregates.json)")
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--batch-interval', type=float, default=1.0,
+                        help="Seconds to wait while filling a micro-batch")
+    parser.add_argument('--snapshot-interval', type=float, default=30.0)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    serve(host=args.host, port=args.port, spool_dir=args.spool, snapshot_path=args.snapshot,
+          batch_size=args.batch_size, batch_interval=args.batch_interval,
+          snapshot_interval=args.snapshot_interval)
+
+if __name__ == "__main__":
+    main()
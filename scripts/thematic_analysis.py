@@ -6,12 +6,11 @@ Uses TF-IDF and keyword extraction to identify themes in reviews
 
 import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
 from collections import Counter, defaultdict
-import matplotlib.pyplot as plt
-import seaborn as sns
-from wordcloud import WordCloud
-from pathlib import Path
+from contextlib import closing, nullcontext
+from rendering import figure_spec, render_figures
+from instrumentation import instrument, record_rows, hot_function
+from review_index import INDEX_PATH, build_index, connect, theme_examples
 import re
 
 # Define theme keywords (manual/rule-based clustering)
@@ -58,6 +57,18 @@ def clean_text(text):
     text = ' '.join(text.split())
     return text
 
+def make_tfidf_vectorizer(max_features=500):
+    """TF-IDF vectorizer shared by keyword extraction and theme discovery"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    
+    return TfidfVectorizer(
+        max_features=max_features,
+        ngram_range=(1, 3),  # unigrams, bigrams, trigrams
+        min_df=2,  # must appear in at least 2 documents
+        max_df=0.8,  # ignore terms that appear in >80% of documents
+        stop_words='english'
+    )
+
 def extract_keywords_tfidf(reviews, n_keywords=20):
     """Extract top keywords using TF-IDF"""
     
@@ -65,13 +76,7 @@ def extract_keywords_tfidf(reviews, n_keywords=20):
     cleaned_reviews = [clean_text(r) for r in reviews]
     
     # TF-IDF vectorization
-    vectorizer = TfidfVectorizer(
-        max_features=500,
-        ngram_range=(1, 3),  # unigrams, bigrams, trigrams
-        min_df=2,  # must appear in at least 2 documents
-        max_df=0.8,  # ignore terms that appear in >80% of documents
-        stop_words='english'
-    )
+    vectorizer = make_tfidf_vectorizer()
     
     try:
         tfidf_matrix = vectorizer.fit_transform(cleaned_reviews)
@@ -88,6 +93,7 @@ def extract_keywords_tfidf(reviews, n_keywords=20):
     except:
         return []
 
+@hot_function
 def assign_themes(text):
     """Assign themes to a review based on keyword matching"""
     if pd.isna(text) or text == '':
@@ -104,13 +110,58 @@ def assign_themes(text):
     
     return matched_themes
 
-def main():
+@instrument('themes')
+def main(plots=True, report=True, preview=False):
     # Load data with sentiment
     print("Loading reviews with sentiment data...")
     df = pd.read_csv('data/reviews_with_sentiment.csv')
     print(f"Loaded {len(df)} reviews")
+    record_rows(rows_in=len(df))
     
-    # Extract keywords per bank
+    # Keywords only feed the printed summary and the report
+    bank_keywords = extract_bank_keywords(df) if report else {}
+    
+    # Assign themes to each review
+    print("\n\nAssigning themes to reviews...")
+    df['themes'] = df['review'].apply(assign_themes)
+    df['num_themes'] = df['themes'].apply(len)
+    df['theme_names'] = df['themes'].apply(lambda x: ', '.join(x) if x else 'No Theme')
+    
+    if report:
+        print_theme_summary(df)
+    
+    # Save results
+    output_path = 'data/reviews_with_themes.csv'
+    
+    # Prepare output columns
+    output_df = df.copy()
+    output_df['identified_themes'] = output_df['theme_names']
+    
+    # Extract top keywords for each review
+    print("\nExtracting top keywords for each review...")
+    output_df['top_keywords'] = output_df['review'].apply(extract_review_keywords)
+    
+    # Save
+    output_df.to_csv(output_path, index=False)
+    print(f"\n✓ Saved results to {output_path}")
+    
+    # Index reviews for fast lookup and report examples
+    build_index(df, INDEX_PATH)
+    print(f"✓ Indexed reviews into {INDEX_PATH}")
+    
+    # Create visualizations
+    if plots:
+        print("\nCreating visualizations...")
+        create_visualizations(df, bank_keywords, preview=preview)
+    
+    # Generate theme summary report
+    if report:
+        generate_theme_report(df, bank_keywords, index_path=INDEX_PATH)
+    
+    return output_df
+
+def extract_bank_keywords(df):
+    """Extract and print top TF-IDF keywords per bank"""
     print("\n=== Extracting Keywords by Bank ===")
     bank_keywords = {}
     
@@ -124,13 +175,10 @@ def main():
         for keyword, score in keywords[:10]:
             print(f"  - {keyword}: {score:.4f}")
     
-    # Assign themes to each review
-    print("\n\nAssigning themes to reviews...")
-    df['themes'] = df['review'].apply(assign_themes)
-    df['num_themes'] = df['themes'].apply(len)
-    df['theme_names'] = df['themes'].apply(lambda x: ', '.join(x) if x else 'No Theme')
-    
-    # Theme analysis
+    return bank_keywords
+
+def print_theme_summary(df):
+    """Print theme coverage and distribution"""
     print("\n=== Theme Analysis Summary ===")
     print(f"\nReviews with at least one theme: {(df['num_themes'] > 0).sum()} ({(df['num_themes'] > 0).sum() / len(df) * 100:.1f}%)")
     print(f"Average themes per review: {df['num_themes'].mean():.2f}")
@@ -159,31 +207,8 @@ def main():
     for theme, count in theme_counts.most_common():
         percentage = (count / len(df)) * 100
         print(f"  {theme}: {count} ({percentage:.1f}%)")
-    
-    # Save results
-    output_path = 'data/reviews_with_themes.csv'
-    
-    # Prepare output columns
-    output_df = df.copy()
-    output_df['identified_themes'] = output_df['theme_names']
-    
-    # Extract top keywords for each review
-    print("\nExtracting top keywords for each review...")
-    output_df['top_keywords'] = output_df['review'].apply(extract_review_keywords)
-    
-    # Save
-    output_df.to_csv(output_path, index=False)
-    print(f"\n✓ Saved results to {output_path}")
-    
-    # Create visualizations
-    print("\nCreating visualizations...")
-    create_visualizations(df, bank_keywords)
-    
-    # Generate theme summary report
-    generate_theme_report(df, bank_keywords)
-    
-    return output_df
 
+@hot_function
 def extract_review_keywords(review, n=5):
     """Extract top keywords from a single review"""
     if pd.isna(review) or review == '':
@@ -205,40 +230,78 @@ def extract_review_keywords(review, n=5):
     
     return ', '.join(top)
 
-def create_visualizations(df, bank_keywords):
-    """Create theme visualizations"""
+def compute_theme_aggregates(df):
+    """Precompute the small tables the theme figures are drawn from"""
+    exploded = df[['bank', 'themes']].explode('themes').dropna(subset=['themes'])
+    theme_df = (exploded.groupby(['bank', 'themes']).size()
+                .reset_index(name='Count')
+                .rename(columns={'bank': 'Bank', 'themes': 'Theme'}))
+    
+    agg = {
+        'theme_totals': None,
+        'theme_pivot': None,
+        'num_themes_counts': df['num_themes'].value_counts().sort_index(),
+        'theme_coverage': (df['num_themes'] > 0).groupby(df['bank']).mean() * 100
+    }
+    if not theme_df.empty:
+        agg['theme_totals'] = theme_df.groupby('Theme')['Count'].sum().sort_values(ascending=False)
+        agg['theme_pivot'] = theme_df.pivot_table(index='Bank', columns='Theme', values='Count', fill_value=0)
+    return agg
+
+def compute_term_frequencies(df, max_terms=200):
+    """
+    Count terms once over the whole corpus and split the counts by bank
+    Returns: dict mapping bank -> {term: count} for its `max_terms` most frequent terms
+    """
+    from scipy import sparse
+    from sklearn.feature_extraction.text import CountVectorizer
+    from wordcloud import STOPWORDS
+    
+    banks = list(df['bank'].unique())
+    reviews = df['review'].fillna('').astype(str)
+    
+    # Run WordCloud's stop words through the same cleaning as the reviews
+    stop_words = sorted({token for word in STOPWORDS for token in clean_text(word).split()})
+    vectorizer = CountVectorizer(preprocessor=clean_text, stop_words=stop_words)
+    try:
+        counts = vectorizer.fit_transform(reviews)
+    except ValueError:
+        # Empty vocabulary (no usable words in any review)
+        return {bank: {} for bank in banks}
+    terms = vectorizer.get_feature_names_out()
+    
+    # Sum document rows per bank with a sparse bank-indicator matrix
+    bank_codes = pd.Categorical(df['bank'], categories=banks).codes
+    indicator = sparse.csr_matrix(
+        (np.ones(len(df)), (bank_codes, np.arange(len(df)))),
+        shape=(len(banks), len(df))
+    )
+    bank_counts = np.asarray((indicator @ counts).todense())
+    
+    frequencies = {}
+    for idx, bank in enumerate(banks):
+        row = bank_counts[idx]
+        top = row.argsort()[::-1][:max_terms]
+        frequencies[bank] = {terms[i]: int(row[i]) for i in top if row[i] > 0}
+    return frequencies
+
+def plot_theme_analysis(agg):
+    """Theme distribution overview (2x2 grid)"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
     
     sns.set_style("whitegrid")
-    Path('visualizations').mkdir(exist_ok=True)
-    
-    # 1. Theme distribution across banks
     fig, axes = plt.subplots(2, 2, figsize=(16, 12))
     
-    # Collect all themes by bank
-    theme_data = []
-    for bank in df['bank'].unique():
-        bank_df = df[df['bank'] == bank]
-        all_themes = []
-        for themes in bank_df['themes']:
-            all_themes.extend(themes)
-        theme_counts = Counter(all_themes)
-        
-        for theme, count in theme_counts.items():
-            theme_data.append({'Bank': bank, 'Theme': theme, 'Count': count})
-    
-    theme_df = pd.DataFrame(theme_data)
-    
-    if not theme_df.empty:
+    if agg['theme_totals'] is not None:
         # Top themes overall
-        theme_totals = theme_df.groupby('Theme')['Count'].sum().sort_values(ascending=False)
-        theme_totals.head(7).plot(kind='barh', ax=axes[0, 0], color='#1f77b4')
+        agg['theme_totals'].head(7).plot(kind='barh', ax=axes[0, 0], color='#1f77b4')
         axes[0, 0].set_title('Top Themes Across All Banks', fontsize=14, fontweight='bold')
         axes[0, 0].set_xlabel('Number of Reviews')
         axes[0, 0].set_ylabel('Theme')
         
         # Themes by bank (stacked bar)
-        theme_pivot = theme_df.pivot_table(index='Bank', columns='Theme', values='Count', fill_value=0)
-        theme_pivot.plot(kind='bar', stacked=True, ax=axes[0, 1])
+        agg['theme_pivot'].plot(kind='bar', stacked=True, ax=axes[0, 1])
         axes[0, 1].set_title('Theme Distribution by Bank', fontsize=14, fontweight='bold')
         axes[0, 1].set_xlabel('Bank')
         axes[0, 1].set_ylabel('Number of Reviews')
@@ -246,53 +309,71 @@ def create_visualizations(df, bank_keywords):
         axes[0, 1].tick_params(axis='x', rotation=45)
     
     # Number of themes per review
-    df['num_themes'].value_counts().sort_index().plot(kind='bar', ax=axes[1, 0], color='#2ca02c')
+    agg['num_themes_counts'].plot(kind='bar', ax=axes[1, 0], color='#2ca02c')
     axes[1, 0].set_title('Distribution of Theme Count per Review', fontsize=14, fontweight='bold')
     axes[1, 0].set_xlabel('Number of Themes')
     axes[1, 0].set_ylabel('Number of Reviews')
     
     # Theme coverage by bank
-    theme_coverage = df.groupby('bank').apply(lambda x: (x['num_themes'] > 0).sum() / len(x) * 100)
-    theme_coverage.plot(kind='bar', ax=axes[1, 1], color='#ff7f0e')
+    agg['theme_coverage'].plot(kind='bar', ax=axes[1, 1], color='#ff7f0e')
     axes[1, 1].set_title('Theme Coverage by Bank (%)', fontsize=14, fontweight='bold')
     axes[1, 1].set_xlabel('Bank')
     axes[1, 1].set_ylabel('Percentage of Reviews with Themes')
     axes[1, 1].tick_params(axis='x', rotation=45)
     
-    plt.tight_layout()
-    plt.savefig('visualizations/theme_analysis.png', dpi=300, bbox_inches='tight')
-    print("✓ Saved theme_analysis.png")
-    plt.close()
-    
-    # 2. Word clouds for each bank
-    fig, axes = plt.subplots(1, 3, figsize=(18, 6))
-    
-    for idx, bank in enumerate(df['bank'].unique()):
-        bank_reviews = ' '.join(df[df['bank'] == bank]['review'].dropna().astype(str))
-        
-        if bank_reviews:
+    fig.tight_layout()
+    return fig
+
+def plot_wordclouds(bank_frequencies):
+    """Word clouds for each bank, three per row"""
+    import matplotlib.pyplot as plt
+    from wordcloud import WordCloud
+    
+    n_banks = max(len(bank_frequencies), 1)
+    ncols = min(n_banks, 3)
+    nrows = int(np.ceil(n_banks / ncols))
+    fig, axes = plt.subplots(nrows, ncols, figsize=(6 * ncols, 4 * nrows), squeeze=False)
+    axes = axes.ravel()
+    
+    for ax in axes:
+        ax.axis('off')
+    
+    for idx, (bank, frequencies) in enumerate(bank_frequencies.items()):
+        if frequencies:
             wordcloud = WordCloud(
                 width=800, height=400,
                 background_color='white',
                 colormap='viridis',
                 max_words=100
-            ).generate(bank_reviews)
+            ).generate_from_frequencies(frequencies)
             
             axes[idx].imshow(wordcloud, interpolation='bilinear')
-            axes[idx].set_title(f'{bank}', fontsize=14, fontweight='bold')
-            axes[idx].axis('off')
+        axes[idx].set_title(f'{bank}', fontsize=14, fontweight='bold')
     
-    plt.tight_layout()
-    plt.savefig('visualizations/wordclouds_by_bank.png', dpi=300, bbox_inches='tight')
-    print("✓ Saved wordclouds_by_bank.png")
-    plt.close()
+    fig.tight_layout()
+    return fig
+
+def create_visualizations(df, bank_keywords, preview=False):
+    """Create theme visualizations"""
+    specs = [
+        figure_spec('theme_analysis.png', plot_theme_analysis, compute_theme_aggregates(df),
+                    dpi=300, bbox_inches='tight'),
+        figure_spec('wordclouds_by_bank.png', plot_wordclouds, compute_term_frequencies(df),
+                    dpi=300, bbox_inches='tight')
+    ]
+    render_figures(specs, output_dir='visualizations', preview=preview)
 
-def generate_theme_report(df, bank_keywords):
-    """Generate a text report summarizing themes"""
+def generate_theme_report(df, bank_keywords, index_path=None):
+    """
+    Generate a text report summarizing themes
+    Example reviews come from the review index when `index_path` is given,
+    otherwise from a scan of `df`
+    """
     
     report_path = 'theme_analysis_report.txt'
+    index = closing(connect(index_path)) if index_path else nullcontext()
     
-    with open(report_path, 'w', encoding='utf-8') as f:
+    with index as conn, open(report_path, 'w', encoding='utf-8') as f:
         f.write("=" * 80 + "\n")
         f.write("THEMATIC ANALYSIS REPORT\n")
         f.write("Task 2: Sentiment and Thematic Analysis\n")
@@ -346,8 +427,12 @@ def generate_theme_report(df, bank_keywords):
                 top_theme = bank_theme_counts.most_common(1)[0][0]
                 f.write(f"\nExample reviews for '{top_theme}':\n")
                 
-                theme_reviews = bank_df[bank_df['themes'].apply(lambda x: top_theme in x)]
-                for idx, row in theme_reviews.head(3).iterrows():
+                if conn is not None:
+                    examples = [(row['review_id'], row) for row in theme_examples(conn, bank, top_theme, limit=3)]
+                else:
+                    theme_reviews = bank_df[bank_df['themes'].apply(lambda x: top_theme in x)]
+                    examples = list(theme_reviews.head(3).iterrows())
+                for idx, row in examples:
                     f.write(f"  {idx+1}. \"{row['review'][:100]}...\"\n")
                     f.write(f"     Rating: {row['rating']}, Sentiment: {row['sentiment_label']}\n\n")
     
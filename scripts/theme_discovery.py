@@ -0,0 +1,276 @@
+"""
+Incremental Theme Discovery for Bank App Reviews
+Clusters reviews with mini-batch k-means on the TF-IDF features used by
+extract_keywords_tfidf, labels clusters with their top terms, and suggests
+keywords to add to THEME_KEYWORDS
+
+Each update costs time proportional to the new batch: the TF-IDF vocabulary
+is fitted once on the first batch and then frozen, the cluster centers are
+moved with MiniBatchKMeans.partial_fit, and rows already clustered are
+recognised by a 64-bit key of bank, date and review text, so a rewritten
+reviews_with_themes.csv only contributes its new rows. Pass --refit to
+start over with a fresh vocabulary when the language of the reviews has
+drifted.
+
+Usage:
+    python scripts/theme_discovery.py update                 # new rows of data/reviews_with_themes.csv
+    python scripts/theme_discovery.py update --input batch.csv
+    python scripts/theme_discovery.py report
+"""
+
+import os
+import json
+import pickle
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from thematic_analysis import THEME_KEYWORDS, clean_text, assign_themes, make_tfidf_vectorizer
+from instrumentation import instrument, record_rows
+
+STATE_PATH = 'data/theme_discovery.pkl'
+CANDIDATES_PATH = 'data/theme_candidates.json'
+
+def review_keys(df):
+    """
+    Stable 64-bit key per row from bank, date and review text, hashed
+    column-wise by pandas, used to skip rows already clustered
+    """
+    columns = pd.DataFrame({
+        'bank': df['bank'].astype(str),
+        'date': df['date'].astype(str) if 'date' in df.columns else '',
+        'review': df['review'].astype(str)
+    })
+    return pd.util.hash_pandas_object(columns, index=False).to_numpy(dtype=np.uint64)
+
+def matched_theme_keywords(term):
+    """Themes whose keywords already match `term` under assign_themes' substring rule"""
+    return [theme for theme, keywords in THEME_KEYWORDS.items()
+            if any(keyword in term for keyword in keywords)]
+
+class ThemeDiscovery:
+    """Mini-batch k-means over frozen TF-IDF features, updated one batch at a time"""
+
+    def __init__(self, n_clusters=12, max_features=2000, random_state=42):
+        self.n_clusters = n_clusters
+        self.max_features = max_features
+        self.random_state = random_state
+        self.vectorizer = None
+        self.model = None
+        self.n_seen = 0
+        self.cluster_sizes = np.zeros(n_clusters, dtype=np.int64)
+        self.cluster_no_theme = np.zeros(n_clusters, dtype=np.int64)
+        # Sorted keys of every row clustered so far (8 bytes per review)
+        self.seen_keys = np.empty(0, dtype=np.uint64)
+
+    def partial_fit(self, reviews):
+        """
+        Update clusters with one batch of review texts
+        The first batch fixes the vocabulary and must hold at least n_clusters reviews
+        Returns: cluster index assigned to each review
+        """
+        from sklearn.cluster import MiniBatchKMeans
+
+        cleaned = [clean_text(r) for r in reviews]
+
+        if self.vectorizer is None:
+            if len(cleaned) < self.n_clusters:
+                raise ValueError(f"First batch needs at least {self.n_clusters} reviews, got {len(cleaned)}")
+            self.vectorizer = make_tfidf_vectorizer(max_features=self.max_features)
+            self.vectorizer.fit(cleaned)
+            self.model = MiniBatchKMeans(n_clusters=self.n_clusters, random_state=self.random_state,
+                                         n_init=3)
+
+        features = self.vectorizer.transform(cleaned)
+        self.model.partial_fit(features)
+        labels = self.model.predict(features)
+
+        no_theme = np.array([not assign_themes(r) for r in reviews], dtype=bool)
+        self.cluster_sizes += np.bincount(labels, minlength=self.n_clusters)
+        self.cluster_no_theme += np.bincount(labels[no_theme], minlength=self.n_clusters)
+        self.n_seen += len(reviews)
+        return labels
+
+    def update(self, df):
+        """
+        Cluster the rows of `df` not seen before
+        Returns: number of new rows clustered
+        """
+        keys = review_keys(df)
+        is_new = ~np.isin(keys, self.seen_keys) & df['review'].notna().to_numpy()
+        new_df = df[is_new]
+
+        if new_df.empty:
+            return 0
+        if self.model is None and len(new_df) < self.n_clusters:
+            # Too few reviews to bootstrap; leave them unseen so the next batch includes them
+            return 0
+
+        self.partial_fit(new_df['review'].astype(str).tolist())
+        self.seen_keys = np.union1d(self.seen_keys, keys[is_new])
+        return len(new_df)
+
+    def cluster_terms(self, top_n=8):
+        """
+        Most distinctive terms per cluster: centroid weight above the
+        size-weighted mean centroid, so words common to every cluster
+        (e.g. 'app', 'bank') don't label them all
+        """
+        terms = self.vectorizer.get_feature_names_out()
+        centers = self.model.cluster_centers_
+        weights = self.cluster_sizes / max(self.cluster_sizes.sum(), 1)
+        distinct = centers - weights @ centers
+        order = np.argsort(distinct, axis=1)[:, ::-1][:, :top_n]
+        return [[terms[i] for i in row if distinct[idx, i] > 0] for idx, row in enumerate(order)]
+
+    def clusters(self, top_n=8, n_candidates=5):
+        """
+        Describe each cluster: size, share without a theme, top terms, the
+        existing theme its terms point to, and candidate keywords for it
+        """
+        described = []
+        for idx, terms in enumerate(self.cluster_terms(top_n=max(top_n, 20))):
+            theme_votes = {}
+            candidates = []
+            for rank, term in enumerate(terms):
+                matched = matched_theme_keywords(term)
+                # Only the leading terms decide which theme a cluster resembles
+                if rank < top_n:
+                    for theme in matched:
+                        theme_votes[theme] = theme_votes.get(theme, 0) + 1
+                if not matched and len(candidates) < n_candidates:
+                    candidates.append(term)
+
+            size = int(self.cluster_sizes[idx])
+            described.append({
+                'cluster': idx,
+                'size': size,
+                'no_theme_share': round(float(self.cluster_no_theme[idx]) / size, 3) if size else 0.0,
+                'label': ' / '.join(terms[:3]),
+                'top_terms': terms[:top_n],
+                'nearest_theme': max(theme_votes, key=theme_votes.get) if theme_votes else None,
+                'candidate_keywords': candidates
+            })
+        return described
+
+    def candidate_keywords(self, min_no_theme_share=None, n_candidates=5):
+        """
+        Candidate additions to THEME_KEYWORDS, from clusters where many reviews get 'No Theme'
+        min_no_theme_share defaults to the share across all clustered reviews
+        Returns: dict mapping an existing theme (or a proposed new one) to keywords
+        """
+        if min_no_theme_share is None:
+            min_no_theme_share = self.cluster_no_theme.sum() / max(self.cluster_sizes.sum(), 1)
+        suggestions = {}
+        for cluster in self.clusters(n_candidates=n_candidates):
+            if cluster['no_theme_share'] < min_no_theme_share or not cluster['candidate_keywords']:
+                continue
+            theme = cluster['nearest_theme'] or f"New Theme: {cluster['label']}"
+            for keyword in cluster['candidate_keywords']:
+                suggestions.setdefault(theme, [])
+                if keyword not in suggestions[theme]:
+                    suggestions[theme].append(keyword)
+        return suggestions
+
+    def save(self, path=STATE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Pickle the attributes rather than the instance, so state saved when
+        # run as a script loads when imported as a module and vice versa
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self.__dict__, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=STATE_PATH, **kwargs):
+        """Restore saved state, or start fresh with `kwargs` if there is none"""
+        discovery = cls(**kwargs)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                discovery.__dict__.update(pickle.load(f))
+        return discovery
+
+@instrument('discover')
+def update_from_csv(input_path, state_path=STATE_PATH, n_clusters=12, refit=False):
+    """Fold new rows of a reviews CSV into the saved clustering"""
+    df = pd.read_csv(input_path)
+    record_rows(rows_in=len(df))
+
+    if refit and os.path.exists(state_path):
+        os.remove(state_path)
+    discovery = ThemeDiscovery.load(state_path, n_clusters=n_clusters)
+
+    added = discovery.update(df)
+    record_rows(rows_out=added)
+    if discovery.model is None:
+        print(f"Not enough reviews to start clustering (need {discovery.n_clusters}).")
+        return discovery
+
+    discovery.save(state_path)
+    print(f"Clustered {added} new reviews ({discovery.n_seen} total)")
+    return discovery
+
+def write_candidates(discovery, path=CANDIDATES_PATH):
+    """Save clusters and keyword suggestions as JSON"""
+    data = {
+        'reviews_clustered': discovery.n_seen,
+        'clusters': discovery.clusters(),
+        'candidate_keywords': discovery.candidate_keywords()
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    return data
+
+def print_report(discovery):
+    print(f"\n=== Discovered Clusters ({discovery.n_seen} reviews) ===")
+    for cluster in sorted(discovery.clusters(), key=lambda c: -c['size']):
+        print(f"\nCluster {cluster['cluster']}: {cluster['label']}")
+        print(f"  Size: {cluster['size']}, No Theme: {cluster['no_theme_share'] * 100:.1f}%")
+        print(f"  Top terms: {', '.join(cluster['top_terms'])}")
+        print(f"  Nearest theme: {cluster['nearest_theme'] or '-'}")
+
+    print("\n=== Candidate THEME_KEYWORDS Additions ===")
+    suggestions = discovery.candidate_keywords()
+    if not suggestions:
+        print("  None")
+    for theme, keywords in suggestions.items():
+        print(f"  {theme}: {', '.join(keywords)}")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Incremental theme discovery")
+    parser.add_argument('--state', default=STATE_PATH, help=f"Clustering state file (default: {STATE_PATH})")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    update = subparsers.add_parser('update', help="Cluster reviews not seen before")
+    update.add_argument('--input', default='data/reviews_with_themes.csv')
+    update.add_argument('--clusters', type=int, default=12, help="Clusters to create on first run")
+    update.add_argument('--refit', action='store_true', help="Discard saved state and start over")
+
+    subparsers.add_parser('report', help="Print clusters and keyword suggestions")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == 'update':
+        if not os.path.exists(args.input):
+            print(f"Error: {args.input} not found.")
+            return
+        discovery = update_from_csv(args.input, args.state, n_clusters=args.clusters, refit=args.refit)
+    else:
+        if not os.path.exists(args.state):
+            print(f"Error: {args.state} not found. Run `update` first.")
+            return
+        discovery = ThemeDiscovery.load(args.state)
+
+    if discovery.model is None:
+        return
+    print_report(discovery)
+    write_candidates(discovery)
+    print(f"\n✓ Saved clusters and candidate keywords to {CANDIDATES_PATH}")
+
+if __name__ == "__main__":
+    main()